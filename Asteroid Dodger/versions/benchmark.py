@@ -0,0 +1,277 @@
+import os
+import sys
+import math
+import time
+import json
+import random
+import argparse
+import importlib
+
+# Frame-time benchmark for every game version. Each version is run headless on
+# SDL's dummy drivers with a fixed seed, a simulated 60 FPS clock and the same
+# scripted input, holding the asteroid count steady. Update, collision and
+# render times are measured separately for every frame.
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ["ASTEROID_DODGER_HEADLESS"] = "1"
+
+import pygame
+
+VERSIONS = ["gamev0", "gamev1", "gamev2", "gamev3", "gamev4", "gamev5", "gamev6", "gamev7"]
+ASTEROID_COUNTS = [10, 100, 1000]
+FRAMES = 300
+SEED = 1234
+FRAME_MS = 1000 / 60
+ASTEROID_SPEED = 2
+PHASES = ["update", "collision", "render"]
+PERCENTILES = [50, 95, 99]
+
+# Input bits, the same as gamev7's; older versions don't define them
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_UP = 4
+INPUT_DOWN = 8
+INPUT_ROTATE_LEFT = 16
+INPUT_ROTATE_RIGHT = 32
+INPUT_SHOOT = 64
+
+# Keys held for each input bit of the shared script
+INPUT_KEYS = [
+    (INPUT_LEFT, pygame.K_LEFT),
+    (INPUT_RIGHT, pygame.K_RIGHT),
+    (INPUT_UP, pygame.K_UP),
+    (INPUT_DOWN, pygame.K_DOWN),
+    (INPUT_ROTATE_LEFT, pygame.K_z),
+    (INPUT_ROTATE_RIGHT, pygame.K_x),
+]
+
+# gamev7.DEMO_SCRIPT, which SessionRunner checks: strafe in a square while turning and firing
+SCRIPT = [
+    (30, INPUT_LEFT | INPUT_SHOOT),
+    (30, INPUT_UP | INPUT_ROTATE_LEFT),
+    (30, INPUT_RIGHT | INPUT_SHOOT),
+    (30, INPUT_DOWN | INPUT_ROTATE_RIGHT),
+]
+
+
+class KeyState:
+    # Stands in for pygame.key.get_pressed() during scripted runs
+    def __init__(self):
+        self.pressed = set()
+
+    def __getitem__(self, key):
+        return key in self.pressed
+
+
+class BenchClock:
+    # Simulated clock so time-based animation runs at the same rate on every machine
+    def __init__(self):
+        self.ticks = 0
+
+    def get_ticks(self):
+        return int(self.ticks)
+
+
+def script_inputs(frames):
+    inputs = []
+    while len(inputs) < frames:
+        for steps, bits in SCRIPT:
+            inputs.extend([bits] * steps)
+    return inputs[:frames]
+
+
+def percentile(samples, p):
+    # Nearest-rank percentile
+    ordered = sorted(samples)
+    index = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+    return ordered[index]
+
+
+class LegacyRunner:
+    # Mirrors the main loop of gamev0-gamev6, which read the keyboard and the clock directly
+    def __init__(self, game, count):
+        self.game = game
+        self.count = count
+        game.screen = pygame.display.set_mode((game.WIDTH, game.HEIGHT))
+        game.all_sprites = pygame.sprite.Group()
+        game.asteroids = pygame.sprite.Group()
+        game.lasers = pygame.sprite.Group()
+        self.explosions = pygame.sprite.Group()
+        self.player = game.Player()
+        game.all_sprites.add(self.player)
+        self.score = 0
+        self.top_up()
+
+    def top_up(self):
+        game = self.game
+        while len(game.asteroids) < self.count:
+            asteroid = game.Asteroid(ASTEROID_SPEED)
+            game.all_sprites.add(asteroid)
+            game.asteroids.add(asteroid)
+
+    def add_explosion(self, center):
+        explosion = self.game.Explosion(center)
+        self.game.all_sprites.add(explosion)
+        self.explosions.add(explosion)
+
+    def update(self, inputs):
+        if inputs & INPUT_SHOOT and hasattr(self.player, "shoot"):
+            self.player.shoot()
+        self.game.all_sprites.update()
+        self.explosions.update()
+
+    def collide(self):
+        game = self.game
+        if hasattr(game, "Laser"):
+            for hit in pygame.sprite.groupcollide(game.asteroids, game.lasers, True, True):
+                self.add_explosion(hit.rect.center)
+                self.score += 50
+        if hasattr(self.player, "radius"):
+            hits = pygame.sprite.spritecollide(self.player, game.asteroids, False, pygame.sprite.collide_circle)
+        else:
+            hits = pygame.sprite.spritecollide(self.player, game.asteroids, False)
+        if hits and hasattr(game, "Explosion"):
+            self.add_explosion(self.player.rect.center)
+
+    def render(self):
+        game = self.game
+        screen = game.screen
+        if hasattr(game, "draw_starfield"):
+            screen.fill((10, 10, 30))
+            game.draw_starfield()
+        else:
+            screen.fill((0, 0, 0))
+        game.all_sprites.draw(screen)
+        if hasattr(self.player, "draw"):
+            self.player.draw(screen)
+            self.explosions.draw(screen)
+        if hasattr(self.player, "energy"):
+            pygame.draw.rect(screen, (255, 255, 255), (game.WIDTH - 30, 10, 20, 100), 2)
+            energy_height = int(self.player.energy)
+            pygame.draw.rect(screen, (0, 255, 0), (game.WIDTH - 28, 110 - energy_height, 16, energy_height))
+        if hasattr(game, "load_font"):
+            score_text = game.load_font(24).render(f"Score: {self.score}", True, (255, 255, 255))
+            screen.blit(score_text, (10, 10))
+        else:
+            game.draw_text(screen, f"Score: {self.score}", 18, game.WIDTH / 2, 10)
+        pygame.display.flip()
+
+    def close(self):
+        pass
+
+
+class SessionRunner:
+    # Drives gamev7's GameSession, which already separates input from the clock
+    # and seeds its own random streams
+    def __init__(self, game, count, seed):
+        if game.DEMO_SCRIPT != SCRIPT:
+            raise ValueError(f"{game.__name__}.DEMO_SCRIPT differs from the benchmark script")
+        self.game = game
+        self.count = count
+        game.screen = pygame.display.set_mode((game.WIDTH, game.HEIGHT))
+        game.sim_ticks = 0
+        self.session = game.GameSession(seed, initial_asteroids=count)
+        self.session.spawning = False
+        self.renderer = game.DirtyRenderer()
+
+    def top_up(self):
+        while len(self.session.asteroids) < self.count:
+            self.session.spawn_asteroid()
+
+    def update(self, inputs):
+        self.session.update(inputs)
+
+    def collide(self):
+        self.session.collide()
+
+    def render(self):
+        self.session.draw(self.renderer)
+
+    def close(self):
+        self.session.close()
+
+
+def run_benchmark(game, count, frames, seed):
+    clock = BenchClock()
+    keys = KeyState()
+    get_ticks, get_pressed = pygame.time.get_ticks, pygame.key.get_pressed
+    pygame.time.get_ticks = clock.get_ticks
+    pygame.key.get_pressed = lambda: keys
+    try:
+        random.seed(seed)
+        runner = SessionRunner(game, count, seed) if hasattr(game, "GameSession") else LegacyRunner(game, count)
+        times = {phase: [] for phase in PHASES}
+        for inputs in script_inputs(frames):
+            clock.ticks += FRAME_MS
+            keys.pressed = {key for bit, key in INPUT_KEYS if inputs & bit}
+            pygame.event.pump()
+
+            start = time.perf_counter()
+            runner.update(inputs)
+            updated = time.perf_counter()
+            runner.collide()
+            collided = time.perf_counter()
+            runner.render()
+            rendered = time.perf_counter()
+
+            times["update"].append((updated - start) * 1000)
+            times["collision"].append((collided - updated) * 1000)
+            times["render"].append((rendered - collided) * 1000)
+            # Replace destroyed asteroids outside the timed phases
+            runner.top_up()
+        runner.close()
+    finally:
+        pygame.time.get_ticks, pygame.key.get_pressed = get_ticks, get_pressed
+
+    result = {}
+    for phase in PHASES:
+        for p in PERCENTILES:
+            result[f"{phase}_p{p}"] = percentile(times[phase], p)
+    totals = [sum(frame) for frame in zip(*(times[phase] for phase in PHASES))]
+    for p in PERCENTILES:
+        result[f"frame_p{p}"] = percentile(totals, p)
+    return result
+
+
+def format_rows(header, rows):
+    # Right-aligned text table with a dashed line under the header
+    widths = [max(len(row[i]) for row in [header] + rows) for i in range(len(header))]
+    lines = ["  ".join(cell.rjust(width) for cell, width in zip(row, widths)) for row in [header] + rows]
+    lines.insert(1, "  ".join("-" * width for width in widths))
+    return "\n".join(lines)
+
+
+def format_table(results):
+    columns = [f"{phase}_p{p}" for phase in PHASES + ["frame"] for p in PERCENTILES]
+    header = ["version", "asteroids"] + columns
+    rows = [[r["version"], str(r["asteroids"])] + [f"{r[c]:.2f}" for c in columns] for r in results]
+    return format_rows(header, rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-frame timings (ms) of every Asteroid Dodger version")
+    parser.add_argument("--versions", nargs="+", default=VERSIONS)
+    parser.add_argument("--counts", nargs="+", type=int, default=ASTEROID_COUNTS)
+    parser.add_argument("--frames", type=int, default=FRAMES)
+    parser.add_argument("--seed", type=int, default=SEED)
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    results = []
+    music = pygame.mixer.music
+    for name in args.versions:
+        game = importlib.import_module(name)
+        # Versions replace pygame.mixer.music with None when their sounds fail to load
+        pygame.mixer.music = music
+        for count in args.counts:
+            result = {"version": name, "asteroids": count}
+            result.update(run_benchmark(game, count, args.frames, args.seed))
+            results.append(result)
+            print(f"{name} with {count} asteroids done", file=sys.stderr)
+
+    print(format_table(results))
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
@@ -0,0 +1,108 @@
+# Narrow-phase collision on cached shapes. Each entity keeps its collision shape
+# up to date when it moves, so tests read plain floats instead of rebuilding
+# centers from rects or radii from rect diagonals, and compare squared
+# distances so no square roots are taken. Circles are used for the player and
+# asteroids; lasers are segments with a small radius (capsules).
+#
+# Shapes also remember how far they moved in the last step (mx, my), so fast
+# lasers can be tested over the whole area they swept instead of only where
+# they ended up. move_to() records that motion; place() teleports the shape.
+
+
+class Circle:
+    __slots__ = ('x', 'y', 'radius', 'mx', 'my')
+
+    def __init__(self, center, radius):
+        self.radius = radius
+        self.place(center)
+
+    def place(self, center):
+        self.x, self.y = center
+        self.mx = self.my = 0
+
+    def move_to(self, center):
+        x, y = center
+        self.mx, self.my = x - self.x, y - self.y
+        self.x, self.y = x, y
+
+
+class Segment:
+    __slots__ = ('ax', 'ay', 'bx', 'by', 'radius', 'mx', 'my')
+
+    def __init__(self, radius=0):
+        self.ax = self.ay = self.bx = self.by = 0
+        self.mx = self.my = 0
+        self.radius = radius
+
+    def place(self, center, direction, half_length):
+        # Centered on center, running along the unit vector direction
+        x, y = center
+        dx, dy = direction[0] * half_length, direction[1] * half_length
+        self.ax, self.ay = x - dx, y - dy
+        self.bx, self.by = x + dx, y + dy
+        self.mx = self.my = 0
+
+    def move_to(self, center, direction, half_length):
+        x, y = center
+        mx, my = x - (self.ax + self.bx) / 2, y - (self.ay + self.by) / 2
+        self.place(center, direction, half_length)
+        self.mx, self.my = mx, my
+
+
+def segment_distance_sq(px, py, ax, ay, bx, by):
+    # Squared distance from the point to the closest point of the segment
+    dx, dy = bx - ax, by - ay
+    fx, fy = px - ax, py - ay
+    length_sq = dx * dx + dy * dy
+    t = (fx * dx + fy * dy) / length_sq if length_sq else 0
+    t = 0 if t < 0 else 1 if t > 1 else t
+    fx -= t * dx
+    fy -= t * dy
+    return fx * fx + fy * fy
+
+
+def swept_segment_overlaps_circle(segment, circle):
+    # Seen from the circle, the segment slid from its previous place to its current
+    # one across a parallelogram; it hit the circle if that area comes within reach
+    mx, my = segment.mx - circle.mx, segment.my - circle.my
+    ax, ay, bx, by = segment.ax, segment.ay, segment.bx, segment.by
+    px, py = circle.x, circle.y
+    reach = segment.radius + circle.radius
+    reach_sq = reach * reach
+    if segment_distance_sq(px, py, ax, ay, bx, by) <= reach_sq:
+        return True
+    if not mx and not my:
+        return False
+    # Inside the parallelogram: solve w = s * (b - a) + t * motion from the previous start
+    ux, uy = bx - ax, by - ay
+    denom = ux * my - uy * mx
+    if denom:
+        wx, wy = px - ax + mx, py - ay + my
+        s = (wx * my - wy * mx) / denom
+        t = (ux * wy - uy * wx) / denom
+        if 0 <= s <= 1 and 0 <= t <= 1:
+            return True
+    # Otherwise near one of the other three edges: the previous segment or an end point's path
+    return (segment_distance_sq(px, py, ax - mx, ay - my, ax, ay) <= reach_sq or
+            segment_distance_sq(px, py, bx - mx, by - my, bx, by) <= reach_sq or
+            segment_distance_sq(px, py, ax - mx, ay - my, bx - mx, by - my) <= reach_sq)
+
+
+# Batched tests: one pass over a list of sprites carrying a `circle`
+
+def circle_hits(circle, sprites):
+    x, y, radius = circle.x, circle.y, circle.radius
+    hits = []
+    for sprite in sprites:
+        other = sprite.circle
+        dx, dy = other.x - x, other.y - y
+        reach = other.radius + radius
+        if dx * dx + dy * dy <= reach * reach:
+            hits.append(sprite)
+    return hits
+
+
+# Callbacks in the style of pygame.sprite.collide_circle, for use with a broad phase
+
+def collide_swept_segment(circle_sprite, segment_sprite):
+    return swept_segment_overlaps_circle(segment_sprite.segment, circle_sprite.circle)
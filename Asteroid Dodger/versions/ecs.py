@@ -0,0 +1,250 @@
+import numpy as np
+
+# Entity-component storage: every component is a typed array with one row per
+# live entity, and systems process whole arrays at once instead of calling an
+# update() method per sprite. Each entity has an owner object (its sprite view)
+# whose `entity` attribute tracks its row; rows are compacted with swap-remove
+# so the arrays never have holes.
+
+# name: (dtype, shape of one row)
+COMPONENTS = {
+    'kind': (np.int8, ()),
+    'pos': (np.float64, (2,)),
+    'prev_pos': (np.float64, (2,)),  # Position before the last movement step, for swept collision
+    'vel': (np.float64, (2,)),
+    'jitter': (np.float64, ()),  # Random drift added to the position every step
+    'rot': (np.float64, ()),
+    'rot_speed': (np.float64, ()),
+    'next_rotation': (np.float64, ()),  # Time the next rotation step is due
+    'rotation_interval': (np.float64, ()),  # Milliseconds between rotation steps, the owner's rotation_rate
+    'radius': (np.float64, ()),
+    'length': (np.float64, ()),  # Segment-shaped entities collide as a capsule this long along their velocity
+    'size': (np.int32, (2,)),  # Size of the current image, for bounds
+    'margin': (np.float64, ()),  # Distance past the screen edge before leaving bounds
+    'respawns': (np.bool_, ()),  # Leaving bounds respawns the entity instead of ending it
+    'frame': (np.int32, ()),
+    'frame_count': (np.int32, ()),  # 0 for entities without an animation
+    'next_frame': (np.float64, ()),  # Time the next animation frame is due
+    'frame_interval': (np.float64, ()),  # Milliseconds between animation frames, the owner's frame_rate
+    'loops': (np.bool_, ()),  # Finished animations start over instead of ending the entity
+}
+
+
+# Vector helpers over a trailing axis of 2; written out because reductions over
+# such a short axis cost more than the arithmetic
+
+def dot(a, b):
+    return a[..., 0] * b[..., 0] + a[..., 1] * b[..., 1]
+
+
+def cross(a, b):
+    return a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
+
+
+def segment_distance_sq(p, a, b):
+    # Squared distance from points to the closest points of segments, broadcast over leading axes
+    d = b - a
+    f = p - a
+    length_sq = dot(d, d)
+    t = np.clip(dot(f, d) / np.where(length_sq, length_sq, 1), 0, 1)
+    offset = f - t[..., None] * d
+    return dot(offset, offset)
+
+
+def swept_capsule_hits(center, a, b, motion, reach_sq):
+    # Whether each segment a-b, which moved by motion relative to the circle at center,
+    # came within reach of it: near the parallelogram's four edges or inside it
+    hit = ((segment_distance_sq(center, a, b) <= reach_sq) |
+           (segment_distance_sq(center, a - motion, b - motion) <= reach_sq) |
+           (segment_distance_sq(center, a - motion, a) <= reach_sq) |
+           (segment_distance_sq(center, b - motion, b) <= reach_sq))
+    # Inside the parallelogram: solve w = s * (b - a) + t * motion from the previous start
+    u = b - a
+    w = center - a + motion
+    denom = cross(u, motion)
+    safe = np.where(denom, denom, 1)
+    s, t = cross(w, motion) / safe, cross(u, w) / safe
+    return hit | ((denom != 0) & (s >= 0) & (s <= 1) & (t >= 0) & (t <= 1))
+
+
+class World:
+    def __init__(self, capacity=64, seed=None):
+        self.count = 0
+        self.owners = []
+        self.rng = np.random.default_rng(seed)  # Accepts a seed or an existing Generator
+        for name, (dtype, shape) in COMPONENTS.items():
+            setattr(self, name, np.zeros((capacity,) + shape, dtype))
+
+    def __len__(self):
+        return self.count
+
+    def grow(self):
+        capacity = len(self.pos) * 2
+        for name in COMPONENTS:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], old.dtype)
+            new[:self.count] = old[:self.count]
+            setattr(self, name, new)
+
+    def spawn(self, owner, kind, **components):
+        # Unset components start at zero
+        if self.count == len(self.pos):
+            self.grow()
+        row = self.count
+        self.count += 1
+        self.owners.append(owner)
+        owner.entity = row
+        for name in COMPONENTS:
+            getattr(self, name)[row] = 0
+        self.kind[row] = kind
+        self.set(row, **components)
+        if 'prev_pos' not in components:
+            self.prev_pos[row] = self.pos[row]
+        return row
+
+    def set(self, row, **components):
+        for name, value in components.items():
+            getattr(self, name)[row] = value
+
+    def destroy(self, owner):
+        row = owner.entity
+        if row is None:
+            return
+        last = self.count - 1
+        if row != last:
+            # Move the last row into the freed one
+            for name in COMPONENTS:
+                array = getattr(self, name)
+                array[row] = array[last]
+            moved = self.owners[last]
+            self.owners[row] = moved
+            moved.entity = row
+        self.owners.pop()
+        self.count = last
+        owner.entity = None
+
+    def snapshot(self):
+        # Copies of the live rows of every component; owners are stored by the caller
+        return {name: getattr(self, name)[:self.count].copy() for name in COMPONENTS}
+
+    def restore(self, arrays, owners):
+        # owners[row] becomes the owner of each restored row
+        count = len(owners)
+        while len(self.pos) < count:
+            self.grow()
+        for name in COMPONENTS:
+            getattr(self, name)[:count] = arrays[name]
+        self.count = count
+        self.owners = list(owners)
+        for row, owner in enumerate(self.owners):
+            owner.entity = row
+
+    def rows(self, kind):
+        return np.flatnonzero(self.kind[:self.count] == kind)
+
+    # Systems
+
+    def movement(self):
+        n = self.count
+        self.prev_pos[:n] = self.pos[:n]
+        self.pos[:n] += self.vel[:n]
+        drifting = np.flatnonzero(self.jitter[:n])
+        if len(drifting):
+            drift = self.rng.uniform(-1, 1, (len(drifting), 2))
+            self.pos[drifting] += drift * self.jitter[drifting, None]
+
+    # Timed systems keep each entity's next due time, like the Scheduler does for
+    # sprites, so all due entities are found with one comparison per array
+
+    def rotation(self, now):
+        # Returns the rows whose rotation changed
+        n = self.count
+        rotating = (self.rot_speed[:n] != 0) & (self.next_rotation[:n] <= now)
+        rows = np.flatnonzero(rotating)
+        self.rot[rows] = (self.rot[rows] + self.rot_speed[rows]) % 360
+        self.next_rotation[rows] += self.rotation_interval[rows]
+        return rows
+
+    def animation(self, now):
+        # Returns the rows that moved to a new frame and the rows whose animation ended
+        n = self.count
+        due = (self.frame_count[:n] > 0) & (self.next_frame[:n] <= now)
+        rows = np.flatnonzero(due)
+        self.next_frame[rows] += self.frame_interval[rows]
+        self.frame[rows] += 1
+        done = self.frame[rows] >= self.frame_count[rows]
+        looping = rows[done & self.loops[rows]]
+        self.frame[looping] = 0
+        return rows[~done | self.loops[rows]], rows[done & ~self.loops[rows]]
+
+    def bounds(self, width, height):
+        # Returns the rows past the screen edge that respawn and the rows that end
+        n = self.count
+        x, y = self.pos[:n, 0], self.pos[:n, 1]
+        half_w, half_h = self.size[:n, 0] / 2, self.size[:n, 1] / 2
+        margin = self.margin[:n]
+        outside = ((y - half_h > height + margin) | (y + half_h < -margin) |
+                   (x - half_w > width + margin) | (x + half_w < -margin))
+        respawns = self.respawns[:n]
+        return np.flatnonzero(outside & respawns), np.flatnonzero(outside & ~respawns)
+
+    def segments(self, rows):
+        # End points of segment-shaped entities, centered on pos and running along vel
+        vel = self.vel[rows]
+        speed = np.hypot(vel[:, 0], vel[:, 1])
+        half = vel * (self.length[rows] / 2 / np.where(speed, speed, 1))[:, None]
+        pos = self.pos[rows]
+        return pos - half, pos + half
+
+    def match_hits(self, rows_a, rows_b, overlap):
+        # Resolves an overlap matrix like pygame's groupcollide with both kills on:
+        # returns (owner_a, [owners_b]) pairs, each b used at most once
+        hits = []
+        used = np.zeros(len(rows_b), bool)
+        for i in np.flatnonzero(overlap.any(axis=1)):
+            hit = overlap[i] & ~used
+            if hit.any():
+                used |= hit
+                hits.append((self.owners[rows_a[i]], [self.owners[row] for row in rows_b[hit]]))
+        return hits
+
+    def collide_segments(self, circle_kind, segment_kind):
+        # Swept circle vs capsule collisions between two kinds: seen from each circle, a
+        # segment slid across a parallelogram during the last step, and it hit if that
+        # area comes within reach (see collision.py)
+        rows_c, rows_s = self.rows(circle_kind), self.rows(segment_kind)
+        if not len(rows_c) or not len(rows_s):
+            return []
+        a, b = self.segments(rows_s)
+        segment_motion = self.pos[rows_s] - self.prev_pos[rows_s]
+        circle_motion = self.pos[rows_c] - self.prev_pos[rows_c]
+        radius_c, radius_s = self.radius[rows_c], self.radius[rows_s]
+
+        # Broad phase over every pair: the swept area fits in a circle around its middle
+        middle_c = self.pos[rows_c] - circle_motion / 2
+        middle_s = (a + b) / 2 - segment_motion / 2
+        bound_c = np.hypot(circle_motion[:, 0], circle_motion[:, 1]) / 2 + radius_c
+        bound_s = (self.length[rows_s] + np.hypot(segment_motion[:, 0], segment_motion[:, 1])) / 2 + radius_s
+        dx = middle_c[:, 0, None] - middle_s[None, :, 0]
+        dy = middle_c[:, 1, None] - middle_s[None, :, 1]
+        bound = bound_c[:, None] + bound_s[None, :]
+        near_c, near_s = np.nonzero(dx * dx + dy * dy <= bound * bound)
+
+        # Exact test for the pairs left
+        center = self.pos[rows_c[near_c]]
+        a, b = a[near_s], b[near_s]
+        motion = segment_motion[near_s] - circle_motion[near_c]
+        reach_sq = (radius_c[near_c] + radius_s[near_s]) ** 2
+        hit = swept_capsule_hits(center, a, b, motion, reach_sq)
+
+        overlap = np.zeros((len(rows_c), len(rows_s)), bool)
+        overlap[near_c[hit], near_s[hit]] = True
+        return self.match_hits(rows_c, rows_s, overlap)
+
+    def collide_circle(self, center, radius, kind):
+        # Owners of the given kind whose circle overlaps the circle at center
+        rows = self.rows(kind)
+        offset = self.pos[rows] - center
+        reach = self.radius[rows] + radius
+        hit = (offset ** 2).sum(axis=1) <= reach ** 2
+        return [self.owners[row] for row in rows[hit]]
@@ -0,0 +1,493 @@
+import os
+
+import numpy as np
+
+# gamev7 opens a display when imported; train on SDL's dummy drivers
+os.environ.setdefault("ASTEROID_DODGER_HEADLESS", "1")
+
+import pygame
+import gamev7 as game
+from ecs import dot, swept_capsule_hits
+from rng import RandomStreams
+from sensors import RAYS, RAY_LENGTH, ray_directions, cast_rays, player_sensors
+
+try:
+    import gymnasium
+    from gymnasium import spaces
+    from gymnasium.vector import AutoresetMode
+except ImportError:  # Gymnasium is optional; the environments keep its API without the base class and spaces
+    gymnasium = None
+
+# Reinforcement-learning environments with the Gymnasium API (reset() and step()
+# returning obs, reward, terminated, truncated, info).
+#
+# Actions are the game's input bits: any combination of INPUT_LEFT, INPUT_RIGHT,
+# INPUT_UP, INPUT_DOWN, INPUT_ROTATE_LEFT, INPUT_ROTATE_RIGHT and INPUT_SHOOT,
+# so Discrete(128). Observations are either
+#   "asteroids": a (1 + max_asteroids, 5) float32 array. Row 0 is the player
+#                (x, y, rotation, energy, radius). The other rows are the nearest
+#                asteroids, (x, y, speed x, speed y, radius) relative to the player
+#                and nearest first, padded with zero rows (radius 0);
+#   "rays": (rays,) float32 clearances around the ship along sensor rays that
+#           turn with it, capped at RAY_LENGTH (see sensors.py);
+#   "frame": a downscaled (height, width) uint8 grayscale frame.
+# Rewards follow the score: a point per 100 ms survived and 50 per asteroid shot.
+#
+# AsteroidDodgerEnv plays the real game through GameSession. gamev7 keeps its
+# state in module globals, so it runs one game per process. VectorAsteroidDodgerEnv
+# steps N games at once with array math over (game, entity) arrays instead of
+# sprites, for training throughput; it follows the same rules with float
+# positions, like the ECS path, and ignores the rotated image size when asteroids
+# leave the screen.
+
+OBSERVATIONS = ("asteroids", "rays", "frame")
+ACTIONS = 128  # Every combination of the input bits below INPUT_PAUSE
+OBS_FEATURES = 5
+MAX_OBSERVED_ASTEROIDS = 16
+FRAME_SIZE = (84, 84)  # (width, height)
+SURVIVAL_REWARD = game.SIM_STEP / 100
+KILL_REWARD = 50
+
+Env = gymnasium.Env if gymnasium is not None else object
+VectorEnv = gymnasium.vector.VectorEnv if gymnasium is not None else object
+SAME_STEP = AutoresetMode.SAME_STEP if gymnasium is not None else "SameStep"
+
+
+def observation_space(observation, max_asteroids, rays, frame_size):
+    if gymnasium is None:
+        return None
+    if observation == "frame":
+        return spaces.Box(0, 255, (frame_size[1], frame_size[0]), np.uint8)
+    if observation == "rays":
+        return spaces.Box(0, RAY_LENGTH, (rays,), np.float32)
+    return spaces.Box(-np.inf, np.inf, (1 + max_asteroids, OBS_FEATURES), np.float32)
+
+
+def check_observation(observation):
+    if observation not in OBSERVATIONS:
+        raise ValueError(f"observation must be one of {', '.join(OBSERVATIONS)}, not {observation!r}")
+
+
+def nearest_rows(player, asteroids, count):
+    # Observation rows for the count asteroids nearest to the player; player is
+    # (x, y, rotation, energy, radius), asteroids an (n, 5) array laid out the same way
+    obs = np.zeros((1 + count, OBS_FEATURES), np.float32)
+    obs[0] = player
+    if len(asteroids):
+        offset = asteroids[:, :2] - player[:2]
+        order = np.argsort(dot(offset, offset))[:count]
+        obs[1:1 + len(order)] = asteroids[order]
+        obs[1:1 + len(order), :2] = offset[order]
+    return obs
+
+
+def grayscale(surface, size):
+    # Downscaled (height, width) luminance of a surface
+    pixels = pygame.surfarray.pixels3d(pygame.transform.smoothscale(surface, size))
+    gray = pixels[..., 0] * 0.299 + pixels[..., 1] * 0.587 + pixels[..., 2] * 0.114
+    return gray.T.astype(np.uint8)
+
+
+class AsteroidDodgerEnv(Env):
+    metadata = {"render_modes": []}
+
+    def __init__(self, observation="asteroids", max_asteroids=MAX_OBSERVED_ASTEROIDS, rays=RAYS,
+                 frame_size=FRAME_SIZE, max_steps=None):
+        check_observation(observation)
+        self.observation = observation
+        self.max_asteroids = max_asteroids
+        self.rays = rays
+        self.frame_size = frame_size
+        self.max_steps = max_steps  # Truncate episodes after this many steps, None for no limit
+        if gymnasium is not None:
+            self.action_space = spaces.Discrete(ACTIONS)
+            self.observation_space = observation_space(observation, max_asteroids, rays, frame_size)
+        self.seeds = np.random.default_rng()  # Game seeds, reseeded by reset(seed=...)
+        self.session = None
+        self.renderer = game.DirtyRenderer() if observation == "frame" else None
+
+    def reset(self, seed=None, options=None):
+        if gymnasium is not None:
+            super().reset(seed=seed)
+        if seed is not None:
+            self.seeds = np.random.default_rng(seed)
+        if self.session is not None:
+            self.session.close()
+        self.session = game.GameSession(int(self.seeds.integers(2 ** 63)))
+        if self.renderer is not None:
+            self.renderer.invalidate()
+        return self.observe(), self.info()
+
+    def step(self, action):
+        session = self.session
+        kills = session.kills
+        session.step(int(action) & (ACTIONS - 1))
+        reward = SURVIVAL_REWARD + (session.kills - kills) * KILL_REWARD
+        truncated = self.max_steps is not None and session.steps >= self.max_steps
+        return self.observe(), reward, session.game_over, truncated, self.info()
+
+    def observe(self):
+        session = self.session
+        if self.observation == "frame":
+            session.draw(self.renderer)
+            return grayscale(game.screen, self.frame_size)
+        player = session.player
+        if self.observation == "rays":
+            return player_sensors(player, session.asteroids, self.rays).astype(np.float32)
+        circle = player.circle
+        asteroids = [(*asteroid.rect.center, asteroid.speedx, asteroid.speedy, asteroid.radius)
+                     for asteroid in session.asteroids]
+        return nearest_rows(np.array((circle.x, circle.y, player.rot, player.energy, player.radius)),
+                            np.array(asteroids, np.float64).reshape(-1, OBS_FEATURES), self.max_asteroids)
+
+    def info(self):
+        return {"score": self.session.score, "kills": self.session.kills, "steps": self.session.steps}
+
+    def close(self):
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+
+
+# Rules of the batched simulation, taken from the sprites they stand in for
+PLAYER_RADIUS = 20
+PLAYER_SPEED = 5
+PLAYER_ROT_SPEED = 5
+PLAYER_TIP = 30  # Lasers start this far ahead of the ship's center
+SHOT_ENERGY = 10
+ENERGY_REGEN = 0.05
+LASER_SPEED = 10
+MAX_LASERS = 16  # Per game; energy runs out long before this many are in flight
+ASTEROID_CAPACITY = 32  # Initial asteroid slots per game, doubled when a game runs out
+ASTEROID_MAX_SPEED = 5
+SPAWN_BUFFER = 100  # How far off screen asteroids spawn
+SIZE_RADIUS = np.array([game.ASTEROID_SIZES[size][2] for size in game.ASTEROID_SIZE_NAMES], np.float64)
+SIZE_IMAGE = np.array([game.ASTEROID_SIZES[size][0] for size in game.ASTEROID_SIZE_NAMES], np.float64)
+
+
+def rotated_half_sizes(image):
+    # Half the width and height of the rotated player image, by rotation step
+    return np.array([game.rotate_image(image, angle).get_size()
+                     for angle in range(0, 360, PLAYER_ROT_SPEED)], np.float64) / 2
+
+
+class VectorAsteroidDodgerEnv(VectorEnv):
+    # Gymnasium vector environment API: actions, observations, rewards and flags
+    # have a leading game axis. Finished games reset within the same step() call,
+    # so the returned observation already belongs to the next game; info holds
+    # the finished games' last observation and info under final_obs and final_info.
+    metadata = {"autoreset_mode": SAME_STEP}
+
+    def __init__(self, num_envs, observation="asteroids", max_asteroids=MAX_OBSERVED_ASTEROIDS, rays=RAYS,
+                 frame_size=FRAME_SIZE, max_steps=None, seed=None):
+        check_observation(observation)
+        self.num_envs = num_envs
+        self.observation = observation
+        self.max_asteroids = max_asteroids
+        self.rays = rays
+        self.frame_size = frame_size
+        self.max_steps = max_steps
+        if gymnasium is not None:
+            self.single_action_space = spaces.Discrete(ACTIONS)
+            self.single_observation_space = observation_space(observation, max_asteroids, rays, frame_size)
+            self.action_space = spaces.MultiDiscrete(np.full(num_envs, ACTIONS))
+            self.observation_space = spaces.Box(
+                np.broadcast_to(self.single_observation_space.low, (num_envs,) + self.single_observation_space.shape),
+                np.broadcast_to(self.single_observation_space.high, (num_envs,) + self.single_observation_space.shape),
+                dtype=self.single_observation_space.dtype)
+        self.player_half_size = rotated_half_sizes(game.player_img_orig)
+        self.width, self.height = game.WIDTH, game.HEIGHT
+
+        n = num_envs
+        # Per game
+        self.ticks = np.zeros(n)
+        self.steps = np.zeros(n, np.int64)
+        self.kills = np.zeros(n, np.int64)
+        self.last_spawn = np.zeros(n)
+        self.player_pos = np.zeros((n, 2))
+        self.player_rot = np.zeros(n, np.int64)
+        self.energy = np.zeros(n)
+        # Per (game, slot); dead slots are skipped with the alive masks
+        self.asteroid_alive = np.zeros((n, ASTEROID_CAPACITY), bool)
+        self.asteroid_pos = np.zeros((n, ASTEROID_CAPACITY, 2))
+        self.asteroid_prev = np.zeros((n, ASTEROID_CAPACITY, 2))
+        self.asteroid_vel = np.zeros((n, ASTEROID_CAPACITY, 2))
+        self.asteroid_size = np.zeros((n, ASTEROID_CAPACITY), np.int64)  # Index into ASTEROID_SIZE_NAMES
+        self.laser_alive = np.zeros((n, MAX_LASERS), bool)
+        self.laser_pos = np.zeros((n, MAX_LASERS, 2))
+        self.laser_dir = np.zeros((n, MAX_LASERS, 2))
+        self.reseed(seed)
+
+    def reseed(self, seed):
+        # Drift and spawns draw from their own streams, like the game's
+        streams = RandomStreams(seed)
+        self.drift = streams.simulation.generator
+        self.spawns = streams.spawn.generator
+
+    def reset(self, seed=None, options=None):
+        if seed is not None:
+            self.reseed(seed)
+        self.reset_games(np.arange(self.num_envs))
+        return self.observe(), self.info()
+
+    def reset_games(self, games):
+        self.ticks[games] = 0
+        self.steps[games] = 0
+        self.kills[games] = 0
+        self.last_spawn[games] = 0
+        self.player_pos[games] = (self.width / 2, self.height / 2)
+        self.player_rot[games] = 0
+        self.energy[games] = 100
+        self.asteroid_alive[games] = False
+        self.laser_alive[games] = False
+        slots = np.arange(game.INITIAL_ASTEROIDS)
+        while len(slots) > self.asteroid_alive.shape[1]:
+            self.grow()
+        self.spawn_asteroids(np.repeat(games, len(slots)), np.tile(slots, len(games)),
+                             game.ASTEROID_SPEED_START)
+
+    def grow(self):
+        for name in ("asteroid_alive", "asteroid_pos", "asteroid_prev", "asteroid_vel", "asteroid_size"):
+            old = getattr(self, name)
+            new = np.zeros((old.shape[0], old.shape[1] * 2) + old.shape[2:], old.dtype)
+            new[:, :old.shape[1]] = old
+            setattr(self, name, new)
+
+    def spawn_positions(self, sizes):
+        # Top-left corner on a random side just off screen, as Asteroid.spawn_position,
+        # returned as centers
+        count = len(sizes)
+        side = self.spawns.integers(4, size=count)
+        along_x = self.spawns.integers(-SPAWN_BUFFER, self.width + SPAWN_BUFFER, count)
+        along_y = self.spawns.integers(-SPAWN_BUFFER, self.height + SPAWN_BUFFER, count)
+        before = self.spawns.integers(-SPAWN_BUFFER * 2, -SPAWN_BUFFER, count)
+        after = self.spawns.integers(SPAWN_BUFFER, SPAWN_BUFFER * 2, count)
+        x = np.select([side < 2, side == 2], [along_x, before], self.width + after)
+        y = np.select([side == 0, side == 1], [before, self.height + after], along_y)
+        return np.stack((x, y), axis=1) + SIZE_IMAGE[sizes, None] / 2
+
+    def spawn_velocities(self, count, speed_multiplier):
+        base_speed = self.spawns.uniform(2, 4, count)
+        return self.spawns.uniform(-1, 1, (count, 2)) * (base_speed * speed_multiplier)[:, None]
+
+    def spawn_asteroids(self, games, slots, speed_multiplier):
+        sizes = self.spawns.integers(len(SIZE_RADIUS), size=len(games))
+        pos = self.spawn_positions(sizes)
+        vel = np.clip(self.spawn_velocities(len(games), speed_multiplier), -ASTEROID_MAX_SPEED, ASTEROID_MAX_SPEED)
+        self.asteroid_alive[games, slots] = True
+        self.asteroid_size[games, slots] = sizes
+        self.asteroid_pos[games, slots] = pos
+        self.asteroid_prev[games, slots] = pos
+        self.asteroid_vel[games, slots] = vel
+
+    def step(self, actions):
+        inputs = np.asarray(actions, np.int64) & (ACTIONS - 1)
+        self.steps += 1
+        self.ticks += game.SIM_STEP
+        self.timed_spawns()
+        self.shoot(inputs)
+        self.move_player(inputs)
+        self.move_asteroids()
+        self.move_lasers()
+        kills = self.collide_lasers()
+        terminated = self.collide_player()
+        truncated = np.zeros(self.num_envs, bool)
+        if self.max_steps is not None:
+            truncated = ~terminated & (self.steps >= self.max_steps)
+        rewards = SURVIVAL_REWARD + kills * KILL_REWARD
+        done = terminated | truncated
+        if not done.any():
+            return self.observe(), rewards, terminated, truncated, self.info()
+        # Keep what the finished games ended with before they restart
+        obs = self.observe()
+        final_obs = np.full(self.num_envs, None, object)
+        for index in np.flatnonzero(done):
+            final_obs[index] = obs[index]
+        final_info = self.info(done)
+        self.reset_games(np.flatnonzero(done))
+        infos = self.info()
+        infos.update(final_obs=final_obs, _final_obs=done, final_info=final_info, _final_info=done)
+        return self.observe(), rewards, terminated, truncated, infos
+
+    def timed_spawns(self):
+        # The game's difficulty curves, read off the clock; an asteroid spawns each
+        # time the current interval passes
+        interval = np.maximum(game.SPAWN_INTERVAL_MIN, game.SPAWN_INTERVAL_START -
+                              (self.ticks // game.SPAWN_INTERVAL_PERIOD) * game.SPAWN_INTERVAL_STEP)
+        due = np.flatnonzero(self.ticks >= self.last_spawn + interval)
+        if not len(due):
+            return
+        self.last_spawn[due] += interval[due]
+        alive = self.asteroid_alive[due]
+        if alive.all(axis=1).any():
+            self.grow()
+            alive = self.asteroid_alive[due]
+        speed = game.ASTEROID_SPEED_START + (self.ticks[due] // game.ASTEROID_SPEED_PERIOD) * game.ASTEROID_SPEED_STEP
+        self.spawn_asteroids(due, alive.argmin(axis=1), speed)
+
+    def shoot(self, inputs):
+        # Before the ship moves, from the tip of the ship along its heading
+        shooting = (inputs & game.INPUT_SHOOT != 0) & (self.energy >= SHOT_ENERGY)
+        free = ~self.laser_alive
+        games = np.flatnonzero(shooting & free.any(axis=1))
+        if not len(games):
+            return
+        slots = free[games].argmax(axis=1)
+        angle = np.radians(self.player_rot[games])
+        direction = np.stack((-np.sin(angle), -np.cos(angle)), axis=1)
+        self.energy[games] -= SHOT_ENERGY
+        self.laser_alive[games, slots] = True
+        self.laser_dir[games, slots] = direction
+        self.laser_pos[games, slots] = self.player_pos[games] + direction * PLAYER_TIP
+
+    def move_player(self, inputs):
+        rot_speed = np.where(inputs & game.INPUT_ROTATE_LEFT, PLAYER_ROT_SPEED,
+                             np.where(inputs & game.INPUT_ROTATE_RIGHT, -PLAYER_ROT_SPEED, 0))
+        self.player_rot = (self.player_rot + rot_speed) % 360
+        # Later keys win, as in Player.update
+        dx = np.where(inputs & game.INPUT_RIGHT, PLAYER_SPEED, np.where(inputs & game.INPUT_LEFT, -PLAYER_SPEED, 0))
+        dy = np.where(inputs & game.INPUT_DOWN, PLAYER_SPEED, np.where(inputs & game.INPUT_UP, -PLAYER_SPEED, 0))
+        half = self.player_half_size[self.player_rot // PLAYER_ROT_SPEED]
+        pos = self.player_pos + np.stack((dx, dy), axis=1)
+        self.player_pos = np.clip(pos, half, (self.width, self.height) - half)
+        self.energy = np.where(self.energy < 100, self.energy + ENERGY_REGEN, self.energy)
+
+    def move_asteroids(self):
+        self.asteroid_prev[:] = self.asteroid_pos
+        self.asteroid_pos += self.asteroid_vel + self.drift.uniform(-game.ASTEROID_JITTER, game.ASTEROID_JITTER,
+                                                                   self.asteroid_pos.shape)
+        # Past the margin: back to a random side at a new speed, keeping the size
+        half = SIZE_IMAGE[self.asteroid_size] / 2
+        x, y = self.asteroid_pos[..., 0], self.asteroid_pos[..., 1]
+        margin = game.ASTEROID_MARGIN
+        outside = self.asteroid_alive & ((y - half > self.height + margin) | (y + half < -margin) |
+                                         (x - half > self.width + margin) | (x + half < -margin))
+        games, slots = np.nonzero(outside)
+        if len(games):
+            pos = self.spawn_positions(self.asteroid_size[games, slots])
+            self.asteroid_pos[games, slots] = pos
+            self.asteroid_prev[games, slots] = pos
+            self.asteroid_vel[games, slots] = self.spawn_velocities(len(games), 1)
+
+    def move_lasers(self):
+        self.laser_pos += self.laser_dir * LASER_SPEED
+        x, y = self.laser_pos[..., 0], self.laser_pos[..., 1]
+        reach = game.LASER_HALF_LENGTH
+        self.laser_alive &= ((x >= -reach) & (x <= self.width + reach) &
+                             (y >= -reach) & (y <= self.height + reach))
+
+    def collide_lasers(self):
+        # Swept capsule vs circle like World.collide_segments; a laser destroys one
+        # asteroid at most. Returns the kills per game.
+        kills = np.zeros(self.num_envs, np.int64)
+        games, slots = np.nonzero(self.laser_alive)
+        if not len(games):
+            return kills
+        pos = self.laser_pos[games, slots]
+        direction = self.laser_dir[games, slots]
+        laser_motion = direction * LASER_SPEED
+
+        # Broad phase: the swept area fits in a circle around its middle
+        offset = self.asteroid_pos[games] - (pos - laser_motion / 2)[:, None]
+        bound = (SIZE_RADIUS.max() + game.LASER_RADIUS + game.LASER_HALF_LENGTH + LASER_SPEED / 2 +
+                 game.ASTEROID_MAX_STEP)
+        near_l, near_a = np.nonzero(self.asteroid_alive[games] & (dot(offset, offset) <= bound * bound))
+        if not len(near_l):
+            return kills
+
+        # Exact test for the pairs left
+        near_games = games[near_l]
+        center = self.asteroid_pos[near_games, near_a]
+        motion = laser_motion[near_l] - (center - self.asteroid_prev[near_games, near_a])
+        half = direction[near_l] * game.LASER_HALF_LENGTH
+        a, b = pos[near_l] - half, pos[near_l] + half
+        reach_sq = (SIZE_RADIUS[self.asteroid_size[near_games, near_a]] + game.LASER_RADIUS) ** 2
+        hit = swept_capsule_hits(center, a, b, motion, reach_sq)
+
+        near_l, near_a = near_l[hit], near_a[hit]
+        # Pairs come out laser by laser; keep the first pair of each laser
+        first = np.flatnonzero(np.r_[True, near_l[1:] != near_l[:-1]]) if len(near_l) else near_l
+        near_l, near_a = near_l[first], near_a[first]
+        self.laser_alive[games[near_l], slots[near_l]] = False
+        destroyed = np.zeros_like(self.asteroid_alive)
+        destroyed[games[near_l], near_a] = True
+        self.asteroid_alive &= ~destroyed
+        kills += destroyed.sum(axis=1)
+        self.kills += kills
+        return kills
+
+    def collide_player(self):
+        offset = self.asteroid_pos - self.player_pos[:, None]
+        reach = SIZE_RADIUS[self.asteroid_size] + PLAYER_RADIUS
+        return (self.asteroid_alive & (dot(offset, offset) <= reach * reach)).any(axis=1)
+
+    def observe(self):
+        if self.observation == "frame":
+            return self.render_frames()
+        if self.observation == "rays":
+            distances = cast_rays(self.player_pos, ray_directions(self.player_rot, self.rays), self.asteroid_pos,
+                                  SIZE_RADIUS[self.asteroid_size], RAY_LENGTH + PLAYER_RADIUS, self.asteroid_alive)
+            return np.maximum(distances - PLAYER_RADIUS, 0).astype(np.float32)
+        count = self.max_asteroids
+        obs = np.zeros((self.num_envs, 1 + count, OBS_FEATURES), np.float32)
+        obs[:, 0, :2] = self.player_pos
+        obs[:, 0, 2] = self.player_rot
+        obs[:, 0, 3] = self.energy
+        obs[:, 0, 4] = PLAYER_RADIUS
+        offset = self.asteroid_pos - self.player_pos[:, None]
+        distance = np.where(self.asteroid_alive, dot(offset, offset), np.inf)
+        order = np.argsort(distance, axis=1)[:, :count]
+        rows = np.arange(self.num_envs)[:, None]
+        listed = obs[:, 1:1 + order.shape[1]]
+        listed[..., :2] = offset[rows, order]
+        listed[..., 2:4] = self.asteroid_vel[rows, order]
+        listed[..., 4] = SIZE_RADIUS[self.asteroid_size[rows, order]]
+        listed[~self.asteroid_alive[rows, order]] = 0
+        return obs
+
+    def render_frames(self):
+        # Discs for asteroids and the ship and dots along the lasers, rasterized
+        # straight into the downscaled frames
+        width, height = self.frame_size
+        frames = np.zeros((self.num_envs, height, width), np.uint8)
+        games, slots = np.nonzero(self.asteroid_alive)
+        self.stamp(frames, games, self.asteroid_pos[games, slots], SIZE_RADIUS[self.asteroid_size[games, slots]], 160)
+        games, slots = np.nonzero(self.laser_alive)
+        for along in (-1, 0, 1):
+            points = self.laser_pos[games, slots] + self.laser_dir[games, slots] * along * game.LASER_HALF_LENGTH
+            self.stamp(frames, games, points, np.zeros(len(games)), 255)
+        games = np.arange(self.num_envs)
+        self.stamp(frames, games, self.player_pos, np.full(self.num_envs, PLAYER_RADIUS), 96)
+        return frames
+
+    def stamp(self, frames, games, centers, radii, value):
+        # Sets the frame pixels whose centers fall inside each circle (at least the
+        # pixel under its center)
+        if not len(games):
+            return
+        height, width = frames.shape[1:]
+        scale = np.array((width / self.width, height / self.height))
+        reach = int(np.ceil(radii.max() * scale.max())) + 1
+        steps = np.arange(-reach, reach + 1)
+        offsets = np.stack(np.meshgrid(steps, steps), axis=-1).reshape(-1, 2)
+        pixels = np.floor(centers * scale).astype(np.int64)[:, None] + offsets
+        offset = (pixels + 0.5) / scale - centers[:, None]
+        inside = dot(offset, offset) <= np.maximum(radii, 0.5 / scale.min())[:, None] ** 2
+        inside[:, len(offsets) // 2] = True
+        inside &= (pixels[..., 0] >= 0) & (pixels[..., 0] < width) & (pixels[..., 1] >= 0) & (pixels[..., 1] < height)
+        rows, hits = np.nonzero(inside)
+        frames[games[rows], pixels[rows, hits, 1], pixels[rows, hits, 0]] = value
+
+    def info(self, games=None):
+        # Gymnasium's vector layout: an array per key, zero outside the games mask, and
+        # the mask under "_" + key
+        if games is None:
+            games = np.ones(self.num_envs, bool)
+        info = {}
+        for key, values in (("score", self.ticks // 100), ("kills", self.kills), ("steps", self.steps)):
+            info[key] = np.where(games, values, 0).astype(np.int64)
+            info[f"_{key}"] = games
+        return info
+
+    def close(self):
+        pass
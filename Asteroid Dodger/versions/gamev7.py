@@ -1,7 +1,29 @@
 import pygame
-import random
 import sys
 import os
+import time
+import argparse
+import pickle
+from array import array
+from collections import OrderedDict
+
+from scheduler import Scheduler, Timer
+from collision import Circle, Segment, circle_hits, collide_swept_segment
+from rng import RandomStreams
+from replay import InputRecorder, Replay, ReplayInput, FLAG_PIXEL_PERFECT, FLAG_ECS
+from leaderboard import Leaderboard
+
+try:
+    from ecs import World
+except ImportError:  # NumPy is optional; entities fall back to per-sprite updates
+    World = None
+
+# Headless mode runs on SDL's dummy drivers: no window, no audio device
+HEADLESS = (any(arg.split("=")[0] in ("--headless", "--replay") for arg in sys.argv) or
+            os.environ.get("ASTEROID_DODGER_HEADLESS") == "1")
+if HEADLESS:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
 
 # Initialize Pygame
 pygame.init()
@@ -13,6 +35,45 @@ WIDTH, HEIGHT = 800, 600
 screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
 pygame.display.set_caption("Asteroid Dodger")
 
+INITIAL_ASTEROIDS = 10
+DIRTY_RECTS = False  # Only push changed regions to the display (--dirty-rects)
+PIXEL_PERFECT = False  # Confirm player hits with pixel masks after the circle test (--pixel-perfect)
+REWIND_SECONDS = 0  # Play history kept for the Backspace rewind debugging key, 0 for none (--rewind)
+
+# Difficulty curves (tuned with runner.py): asteroids spawn more often every
+# SPAWN_INTERVAL_PERIOD and get faster every ASTEROID_SPEED_PERIOD milliseconds
+SPAWN_INTERVAL_START = 1500
+SPAWN_INTERVAL_MIN = 250
+SPAWN_INTERVAL_STEP = 100
+SPAWN_INTERVAL_PERIOD = 3000
+ASTEROID_SPEED_START = 1.5
+ASTEROID_SPEED_STEP = 0.3
+ASTEROID_SPEED_PERIOD = 5000
+
+# Fixed-timestep simulation: gameplay always advances in SIM_STEP increments
+# while rendering runs at up to MAX_FPS (0 means uncapped)
+SIM_RATE = 60
+SIM_STEP = 1000 / SIM_RATE
+MAX_FPS = 144
+MAX_FRAME_TIME = 250  # Clamp long frames so a stall doesn't trigger a burst of steps
+TELEPORT_DISTANCE = 100  # Don't interpolate sprites that jumped further than this
+
+# Simulation time in milliseconds; it only advances while the game is unpaused
+sim_ticks = 0
+
+# Random numbers come from separate seeded streams; GameSession reseeds them
+rng = RandomStreams()
+
+# Input state bits, filled from the keyboard or from a scripted input source
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_UP = 4
+INPUT_DOWN = 8
+INPUT_ROTATE_LEFT = 16  # Z
+INPUT_ROTATE_RIGHT = 32  # X
+INPUT_SHOOT = 64  # Space, pressed since the previous step
+INPUT_PAUSE = 128  # P, pressed since the previous step; only kept for replays
+
 # Set up asset directories
 game_folder = os.path.dirname(__file__)
 parent_folder = os.path.abspath(os.path.join(game_folder, ".."))
@@ -22,9 +83,75 @@ sound_folder = os.path.join(parent_folder, "sounds")
 bg_music_volume = 0.5
 effects_volume = 0.5
 
-# Fonts
+# Bounded least-recently-used cache
+class LRUCache:
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.items = OrderedDict()
+
+    def get(self, key):
+        value = self.items.get(key)
+        if value is not None:
+            self.items.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.items[key] = value
+        self.items.move_to_end(key)
+        if len(self.items) > self.max_size:
+            self.items.popitem(last=False)
+
+    def clear(self):
+        self.items.clear()
+
+# Fixed-size buffer holding the most recent items, oldest overwritten first
+class RingBuffer:
+    def __init__(self, capacity):
+        self.items = [None] * capacity
+        self.end = 0  # Slot the next item goes into
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def append(self, item):
+        self.items[self.end] = item
+        self.end = (self.end + 1) % len(self.items)
+        self.count = min(self.count + 1, len(self.items))
+
+    def pop(self):
+        # Removes and returns the newest item
+        self.end = (self.end - 1) % len(self.items)
+        self.count -= 1
+        item = self.items[self.end]
+        self.items[self.end] = None
+        return item
+
+    def clear(self):
+        self.items = [None] * len(self.items)
+        self.end = 0
+        self.count = 0
+
+# Fonts are loaded once per size and rendered text is cached per (font, string, color)
+FONT_PATH = pygame.font.match_font('arial')
+TEXT_CACHE_SIZE = 256
+fonts = {}
+text_cache = LRUCache(TEXT_CACHE_SIZE)
+
 def load_font(size):
-    return pygame.font.Font(pygame.font.match_font('arial'), size)
+    font = fonts.get(size)
+    if font is None:
+        font = pygame.font.Font(FONT_PATH, size)
+        fonts[size] = font
+    return font
+
+def render_text(font, text, color):
+    key = (font, text, color)
+    text_surf = text_cache.get(key)
+    if text_surf is None:
+        text_surf = font.render(text, True, color).convert_alpha()
+        text_cache.put(key, text_surf)
+    return text_surf
 
 # Colors
 WHITE = (255, 255, 255)
@@ -32,9 +159,16 @@ GRAY = (200, 200, 200)
 DARK_GRAY = (50, 50, 50)
 LIGHT_BLUE = (173, 216, 230)
 BLACK = (0, 0, 0)
+BACKGROUND_COLOR = (10, 10, 30)
 
-# High scores file
+# Scores of every finished game go into the leaderboard database (see leaderboard.py);
+# the old top-5 scores file is imported when the database is created
 HIGH_SCORES_FILE = os.path.join(game_folder, "scores.txt")
+LEADERBOARD_FILE = os.path.join(game_folder, "leaderboard.db")
+HIGH_SCORES_SHOWN = 5
+GAME_VERSION = "gamev7"
+PLAYER_NAME = os.environ.get("USER") or os.environ.get("USERNAME") or "player"  # --player
+REPLAY_FILE = os.path.join(game_folder, "last_game.replay")  # Inputs of the last game, see replay.py
 
 # Load images
 def create_player_image():
@@ -55,9 +189,11 @@ def create_player_image():
     pygame.draw.polygon(ship_img, (160, 160, 160), [(10, 50), (50, 50), (40, 60), (20, 60)])
     return ship_img
 
+LASER_FRAMES = 5  # Widths of the laser's glow animation
+
 def create_laser_images():
     laser_anim = []
-    for i in range(5):
+    for i in range(LASER_FRAMES):
         width = 5 + i * 2
         laser_img = pygame.Surface((width, 30), pygame.SRCALPHA)
         # Draw the main beam in the center
@@ -76,23 +212,163 @@ def create_explosion_images():
         explosion_anim.append(frame)
     return explosion_anim
 
+# Star sprite sizes and twinkle alpha levels
+STAR_SIZES = [2, 3, 4]
+STAR_ALPHA_MIN, STAR_ALPHA_MAX = 150, 255
+STAR_ALPHA_BUCKETS = 8
+
+# Asteroid size classes: (image size, base color, radius)
+ASTEROID_SIZES = {
+    'large': (80, (100, 100, 100), 40),
+    'medium': (60, (130, 130, 130), 30),
+    'small': (40, (160, 160, 160), 20),
+}
+ASTEROID_TEXTURES_PER_SIZE = 8
+ASTEROID_SIZE_NAMES = list(ASTEROID_SIZES)  # Size classes by index, for snapshots
+
+def create_asteroid_image(size):
+    image_size, color, radius = ASTEROID_SIZES[size]
+    asteroid_img = pygame.Surface((image_size, image_size), pygame.SRCALPHA)
+    pygame.draw.circle(asteroid_img, color, (radius, radius), radius)
+    # Add crater details
+    num_craters = rng.cosmetic.randint(3, 7)
+    crater_color = (max(color[0] - 30, 0), max(color[1] - 30, 0), max(color[2] - 30, 0))
+    for _ in range(num_craters):
+        crater_radius = rng.cosmetic.randint(3, 6)
+        # Ensure crater centers are within the asteroid circle minus crater radius
+        angle = rng.cosmetic.uniform(0, 360)
+        distance = rng.cosmetic.uniform(0, radius - crater_radius - 2)  # Subtract 2 for padding
+        direction = pygame.math.Vector2(1, 0).rotate(angle)
+        x = radius + int(distance * direction.x)
+        y = radius + int(distance * direction.y)
+        pygame.draw.circle(asteroid_img, crater_color, (x, y), crater_radius)
+    return asteroid_img
+
+def create_asteroid_textures():
+    # Pre-generated bank of crater textures for each size class
+    return {size: [create_asteroid_image(size) for _ in range(ASTEROID_TEXTURES_PER_SIZE)]
+            for size in ASTEROID_SIZES}
+
 def create_starfield():
     stars = []
     for _ in range(100):
-        x = random.randrange(0, WIDTH)
-        y = random.randrange(0, HEIGHT)
-        speed = random.uniform(1, 3)
-        size = random.choice([2, 3, 4])  # Assign size between 2 to 4
+        x = rng.cosmetic.randrange(0, WIDTH)
+        y = rng.cosmetic.randrange(0, HEIGHT)
+        speed = rng.cosmetic.uniform(1, 3)
+        size = rng.cosmetic.choice(STAR_SIZES)  # Assign size between 2 to 4
         stars.append([x, y, speed, size])
     return stars
 
+def create_star_atlas():
+    # Pre-render every (size, alpha bucket) star once so drawing is blit-only
+    atlas = {}
+    for size in STAR_SIZES:
+        for bucket in range(STAR_ALPHA_BUCKETS):
+            alpha = STAR_ALPHA_MIN + bucket * (STAR_ALPHA_MAX - STAR_ALPHA_MIN) // (STAR_ALPHA_BUCKETS - 1)
+            star_surface = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.circle(star_surface, WHITE, (size // 2, size // 2), size // 2)
+            star_surface.set_alpha(alpha)
+            atlas[(size, bucket)] = star_surface
+    return atlas
+
+# Rotated images are cached per (source image, quantized angle)
+ROTATION_STEP = 5  # Degrees between cached rotation frames
+# Room for every rotation of the asteroid textures, the player and the laser frames
+ROTATION_CACHE_SIZE = (360 // ROTATION_STEP) * (len(ASTEROID_SIZES) * ASTEROID_TEXTURES_PER_SIZE + 1 + LASER_FRAMES)
+rotation_cache = LRUCache(ROTATION_CACHE_SIZE)
+
+def rotation_key(image, angle):
+    return (image, round(angle / ROTATION_STEP) % (360 // ROTATION_STEP))
+
+def rotate_image(image, angle):
+    key = rotation_key(image, angle)
+    rotated = rotation_cache.get(key)
+    if rotated is None:
+        rotated = pygame.transform.rotate(image, key[1] * ROTATION_STEP)
+        rotation_cache.put(key, rotated)
+    return rotated
+
+# Collision masks of the rotated images, cached under the same keys. Masks are only
+# used by the pixel-perfect mode, which precomputes every angle of the player and
+# asteroid images so no mask is built during play.
+# Room for every rotation of the asteroid textures and the player
+MASK_CACHE_SIZE = (360 // ROTATION_STEP) * (len(ASTEROID_SIZES) * ASTEROID_TEXTURES_PER_SIZE + 1)
+mask_cache = LRUCache(MASK_CACHE_SIZE)
+
+def rotated_mask(image, angle):
+    key = rotation_key(image, angle)
+    mask = mask_cache.get(key)
+    if mask is None:
+        rotated = rotation_cache.get(key) or pygame.transform.rotate(image, key[1] * ROTATION_STEP)
+        mask = pygame.mask.from_surface(rotated)
+        mask_cache.put(key, mask)
+    return mask
+
+def precompute_masks():
+    for image in [player_img_orig] + [texture for textures in asteroid_textures.values() for texture in textures]:
+        for step in range(360 // ROTATION_STEP):
+            rotated_mask(image, step * ROTATION_STEP)
+
+def mask_radius(image):
+    # Distance from the image center to its furthest opaque pixel, so a circle this
+    # big around the sprite contains it at every rotation
+    mask = pygame.mask.from_surface(image)
+    cx, cy = image.get_width() / 2, image.get_height() / 2
+    return max(((x + 0.5 - cx) ** 2 + (y + 0.5 - cy) ** 2) ** 0.5 for x, y in mask.outline()) + 1
+
+def collide_masks(left, right):
+    # Pixel test between two rotating sprites, using the masks of their current rotation
+    offset = (right.rect.x - left.rect.x, right.rect.y - left.rect.y)
+    left_mask = rotated_mask(left.image_orig, left.rot)
+    return left_mask.overlap(rotated_mask(right.image_orig, right.rot), offset) is not None
+
 # Load images
 player_img_orig = create_player_image()
 laser_anim = create_laser_images()
 explosion_anim = create_explosion_images()
+asteroid_textures = create_asteroid_textures()
+
+player_mask_radius = mask_radius(player_img_orig)
 
 # Starfield for dynamic background
 starfield = create_starfield()
+star_atlas = create_star_atlas()
+
+# Generated images are converted to the display's pixel format so blits don't
+# convert every pixel. Recreating the display can change that format, so this
+# runs again on resize; it returns a map from old to new surfaces.
+def convert_assets():
+    global player_img_orig
+    converted = {}
+
+    def convert(surface):
+        new_surface = surface.convert_alpha()
+        converted[surface] = new_surface
+        return new_surface
+
+    player_img_orig = convert(player_img_orig)
+    laser_anim[:] = [convert(frame) for frame in laser_anim]
+    explosion_anim[:] = [convert(frame) for frame in explosion_anim]
+    for textures in asteroid_textures.values():
+        textures[:] = [convert(texture) for texture in textures]
+    for key, star_surface in star_atlas.items():
+        star_atlas[key] = convert(star_surface)
+    # Cached surfaces were made from the old images
+    rotation_cache.clear()
+    text_cache.clear()
+    mask_cache.clear()
+    if PIXEL_PERFECT:
+        precompute_masks()
+    return converted
+
+def resize_display(width, height):
+    global WIDTH, HEIGHT, screen, starfield
+    WIDTH, HEIGHT = width, height
+    screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
+    starfield = create_starfield()
+    return convert_assets()
+
+convert_assets()
 
 # Load sounds
 try:
@@ -107,6 +383,17 @@ except pygame.error as e:
     collision_sound = None
     moving_sound = None
 
+# Entity kinds in the ECS World
+ENTITY_ASTEROID = 1
+ENTITY_LASER = 2
+ENTITY_EXPLOSION = 3
+
+ASTEROID_JITTER = 1.0  # Random per-frame drift added to every asteroid
+ASTEROID_MARGIN = 200  # Distance past the screen edge before an asteroid respawns
+LASER_HALF_LENGTH = 15  # Lasers collide as a segment along the beam
+LASER_RADIUS = 1
+ASTEROID_MAX_STEP = 10  # Furthest an asteroid moves in one step, for swept collision lookups
+
 # Classes
 class Button:
     def __init__(self, rect, text, callback):
@@ -115,7 +402,7 @@ class Button:
         self.callback = callback
         self.color = DARK_GRAY
         self.font = load_font(36)
-        self.text_surf = self.font.render(self.text, True, WHITE)
+        self.text_surf = render_text(self.font, self.text, WHITE)
         self.text_rect = self.text_surf.get_rect(center=self.rect.center)
 
     def draw(self, surface):
@@ -130,14 +417,24 @@ class Button:
         else:
             self.color = DARK_GRAY
 
-class Player(pygame.sprite.Sprite):
+    def place(self, x, y):
+        self.rect.topleft = (x, y)
+        self.text_rect.center = self.rect.center
+
+class Player(pygame.sprite.DirtySprite):
+    _layer = 1  # Drawn above asteroids and lasers
+
     def __init__(self):
         super().__init__()
+        self.dirty = 2  # Moving sprites are repainted every frame
         self.image_orig = player_img_orig
         self.image = self.image_orig.copy()
         self.rect = self.image.get_rect()
         self.radius = 20
         self.rect.center = (WIDTH / 2, HEIGHT / 2)
+        # Collision shape, moved with the ship; pixel-perfect mode needs it to cover the
+        # whole ship so the mask test sees every possible hit
+        self.circle = Circle(self.rect.center, player_mask_radius if PIXEL_PERFECT else self.radius)
         self.speedx = 0
         self.speedy = 0
         self.speed = 5
@@ -145,40 +442,40 @@ class Player(pygame.sprite.Sprite):
         self.last_move_time = 0  # For movement sound cooldown
         self.rot = 0  # Rotation angle
         self.rot_speed = 0
+        self.inputs = 0  # Input bits for the current simulation step
         # Define a fixed tip offset vector (pointing upwards in local coordinates)
         self.tip_offset = pygame.math.Vector2(0, -30)  # Adjust as needed based on ship size
 
     def update(self):
         self.speedx = 0
         self.speedy = 0
-        # Get keys pressed
-        keystate = pygame.key.get_pressed()
-        current_time = pygame.time.get_ticks()
+        inputs = self.inputs
+        current_time = sim_ticks
         moving = False
 
         # Rotation
-        if keystate[pygame.K_z]:
+        if inputs & INPUT_ROTATE_LEFT:
             self.rot_speed = 5
-        elif keystate[pygame.K_x]:
+        elif inputs & INPUT_ROTATE_RIGHT:
             self.rot_speed = -5
         else:
             self.rot_speed = 0
 
         self.rot = (self.rot + self.rot_speed) % 360
-        self.image = pygame.transform.rotate(self.image_orig, self.rot)
+        self.image = rotate_image(self.image_orig, self.rot)
         self.rect = self.image.get_rect(center=self.rect.center)
 
         # Movement
-        if keystate[pygame.K_LEFT] or keystate[pygame.K_a]:
+        if inputs & INPUT_LEFT:
             self.speedx = -self.speed
             moving = True
-        if keystate[pygame.K_RIGHT] or keystate[pygame.K_d]:
+        if inputs & INPUT_RIGHT:
             self.speedx = self.speed
             moving = True
-        if keystate[pygame.K_UP] or keystate[pygame.K_w]:
+        if inputs & INPUT_UP:
             self.speedy = -self.speed
             moving = True
-        if keystate[pygame.K_DOWN] or keystate[pygame.K_s]:
+        if inputs & INPUT_DOWN:
             self.speedy = self.speed
             moving = True
 
@@ -200,694 +497,1497 @@ class Player(pygame.sprite.Sprite):
             self.rect.top = 0
         if self.rect.bottom > HEIGHT:
             self.rect.bottom = HEIGHT
+        self.circle.move_to(self.rect.center)
 
         # Regenerate energy slowly
         if self.energy < 100:
             self.energy += 0.05  # Adjust the regeneration rate as needed
 
     def shoot(self):
+        # Returns the new laser, or None when there isn't enough energy
         if self.energy >= 10:
             # Rotate the tip offset based on current rotation to get global position
             rotated_tip_offset = self.tip_offset.rotate(-self.rot)
             laser_x = self.rect.centerx + rotated_tip_offset.x
             laser_y = self.rect.centery + rotated_tip_offset.y
             # Create a new laser with the current rotation angle
-            laser = Laser(laser_x, laser_y, self.rot)
-            all_sprites.add(laser)
-            lasers.add(laser)
+            laser = Laser.pool.acquire(laser_x, laser_y, self.rot)
             self.energy -= 10  # Decrease energy
             if laser_sound:
                 laser_sound.set_volume(effects_volume)
                 laser_sound.play()
+            return laser
+        return None
 
     def draw(self, surface):
-        surface.blit(self.image, self.rect)
+        return surface.blit(self.image, self.rect)
         # Optional: Draw a line indicating the laser's origin for debugging
         #tip_pos = self.rect.center + self.tip_offset.rotate(-self.rot)
         #pygame.draw.line(surface, (0, 255, 0), self.rect.center, tip_pos, 2)
 
-class Laser(pygame.sprite.Sprite):
+# Lasers and explosions are created by the dozen per second, so they are compact
+# slot-based objects recycled through a pool instead of full Sprites. They live
+# in a single EntityGroup, which draws them like a sprite group.
+class TransientEntity:
+    __slots__ = ('image', 'rect', 'group', 'entity', 'timer', 'prev_center')
+    pool = None
+
+    def alive(self):
+        return self.group is not None
+
+    def kill(self):
+        # Leaves its group, stops its timer and goes back to the pool
+        if self.group is not None:
+            self.group.remove(self)
+            if self.timer is not None:
+                self.timer.cancel()
+                self.timer = None
+            self.pool.release(self)
+
+class EntityGroup:
+    def __init__(self):
+        self.entities = {}  # Dict keys keep insertion order like a sprite group
+
+    def __len__(self):
+        return len(self.entities)
+
+    def __iter__(self):
+        return iter(list(self.entities))
+
+    def sprites(self):
+        return list(self.entities)
+
+    def add(self, entity):
+        self.entities[entity] = None
+        entity.group = self
+
+    def remove(self, entity):
+        del self.entities[entity]
+        entity.group = None
+
+    def update(self):
+        for entity in list(self.entities):
+            entity.update()
+
+    def draw(self, surface):
+        return surface.blits([(entity.image, entity.rect) for entity in self.entities])
+
+    def empty(self):
+        for entity in list(self.entities):
+            entity.kill()
+
+class EntityPool:
+    def __init__(self, entity_class):
+        self.entity_class = entity_class
+        self.free = []
+
+    def acquire(self, *args):
+        if self.free:
+            entity = self.free.pop()
+            entity.reset(*args)
+        else:
+            entity = self.entity_class(*args)
+        return entity
+
+    def release(self, entity):
+        self.free.append(entity)
+
+class Laser(TransientEntity):
+    __slots__ = ('frames', 'frame', 'image_orig', 'speed', 'angle', 'direction', 'frame_rate', 'segment')
+
     def __init__(self, x, y, angle):
-        super().__init__()
+        self.group = None
+        self.segment = Segment(LASER_RADIUS)  # Collision shape, moved with the laser
+        self.reset(x, y, angle)
+
+    def reset(self, x, y, angle):
+        # Called on construction and whenever the pool hands the laser out again
         self.frames = laser_anim
         self.frame = 0
         self.image_orig = self.frames[self.frame]
-        self.image = pygame.transform.rotate(self.image_orig, angle)
+        self.image = rotate_image(self.image_orig, angle)
         self.rect = self.image.get_rect()
         self.rect.center = (x, y)
+        self.prev_center = self.rect.center
         self.speed = 10  # Positive speed; direction is handled by the vector
         self.angle = angle
-        self.last_update = pygame.time.get_ticks()
+        self.direction = pygame.math.Vector2(0, -1).rotate(-angle)  # Negative to align with rotation
+        self.segment.place(self.rect.center, self.direction, LASER_HALF_LENGTH)
         self.frame_rate = 50  # Adjust for animation speed
+        self.entity = None  # Row in the World when simulated by the ECS systems
+        self.timer = None  # Animation timer when updated as a sprite
+
+    def join_world(self, world):
+        world.spawn(self, ENTITY_LASER, pos=self.rect.center, vel=self.direction * self.speed, rot=self.angle,
+                    radius=LASER_RADIUS, length=LASER_HALF_LENGTH * 2, size=self.rect.size,
+                    frame_count=len(self.frames), next_frame=sim_ticks + self.frame_rate,
+                    frame_interval=self.frame_rate, loops=True)
+
+    def join_scheduler(self, scheduler):
+        self.timer = scheduler.every(self.frame_rate, self.next_frame)
+
+    def next_frame(self):
+        # Animate laser
+        self.frame = (self.frame + 1) % len(self.frames)
+        old_center = self.rect.center
+        self.image_orig = self.frames[self.frame]
+        self.image = rotate_image(self.image_orig, self.angle)
+        self.rect = self.image.get_rect()
+        self.rect.center = old_center
+
+    def refresh_image(self, world):
+        self.frame = world.frame[self.entity]
+        self.image_orig = self.frames[self.frame]
+        self.image = rotate_image(self.image_orig, self.angle)
+        self.rect = self.image.get_rect()
+        world.size[self.entity] = self.rect.size
 
     def update(self):
-        # Calculate direction vector based on angle
-        direction = pygame.math.Vector2(0, -1).rotate(-self.angle)  # Negative to align with rotation
         # Update position
+        direction = self.direction
         self.rect.x += self.speed * direction.x
         self.rect.y += self.speed * direction.y
+        self.segment.move_to(self.rect.center, direction, LASER_HALF_LENGTH)
 
         # Remove laser if it goes off screen
         if (self.rect.bottom < 0 or self.rect.top > HEIGHT or
             self.rect.right < 0 or self.rect.left > WIDTH):
             self.kill()
 
-        # Animate laser
-        now = pygame.time.get_ticks()
-        if now - self.last_update > self.frame_rate:
-            self.last_update = now
-            self.frame = (self.frame + 1) % len(self.frames)
-            old_center = self.rect.center
-            self.image_orig = self.frames[self.frame]
-            self.image = pygame.transform.rotate(self.image_orig, self.angle)
-            self.rect = self.image.get_rect()
-            self.rect.center = old_center
+    def swept_rect(self):
+        # Covers the beam's path since the last step and any asteroid that moved into it
+        segment = self.segment
+        return self.rect.union(self.rect.move(-segment.mx, -segment.my)).inflate(ASTEROID_MAX_STEP * 2,
+                                                                                 ASTEROID_MAX_STEP * 2)
 
-class Asteroid(pygame.sprite.Sprite):
+class Asteroid(pygame.sprite.DirtySprite):
     def __init__(self, speed_multiplier, max_speed=5):
         super().__init__()
-        self.size = random.choice(['large', 'medium', 'small'])
-        self.image_orig = self.create_asteroid_image()
-        self.image = self.image_orig.copy()
+        self.dirty = 2
+        self.circle = Circle((0, 0), 0)  # Collision shape when updated as a sprite; the World keeps its own
+        self.reset(speed_multiplier, max_speed)
+
+    def reset(self, speed_multiplier, max_speed=5):
+        # Called on construction and whenever the pool hands the asteroid out again
+        self.size = rng.spawn.choice(['large', 'medium', 'small'])
+        self.image_orig = rng.spawn.choice(asteroid_textures[self.size])
+        self.image = self.image_orig
         self.rect = self.image.get_rect()
-        if self.size == 'large':
-            self.radius = 40
-        elif self.size == 'medium':
-            self.radius = 30
-        else:
-            self.radius = 20
+        self.radius = ASTEROID_SIZES[self.size][2]
         self.spawn_position()
-        base_speed = random.uniform(2, 4)  # Adjusted base speed range for faster asteroids
+        self.circle.radius = self.radius
+        self.circle.place(self.rect.center)
+        base_speed = rng.spawn.uniform(2, 4)  # Adjusted base speed range for faster asteroids
 
-        self.speedx = random.uniform(-1, 1) * base_speed * speed_multiplier
-        self.speedy = random.uniform(-1, 1) * base_speed * speed_multiplier
+        self.speedx = rng.spawn.uniform(-1, 1) * base_speed * speed_multiplier
+        self.speedy = rng.spawn.uniform(-1, 1) * base_speed * speed_multiplier
 
         # Set max speed
         self.speedx = max(-max_speed, min(self.speedx, max_speed))
         self.speedy = max(-max_speed, min(self.speedy, max_speed))
 
         self.rot = 0
-        self.rot_speed = random.randrange(-8, 8)
-        self.last_update = pygame.time.get_ticks()
+        self.rot_speed = rng.spawn.randrange(-8, 8)
+        self.rotation_rate = 50  # Milliseconds between rotation steps
+        self.entity = None  # Row in the World when simulated by the ECS systems
+        self.timer = None  # Rotation timer when updated as a sprite
 
         # Ensure asteroids are moving
         if self.speedx == 0 and self.speedy == 0:
-            self.speedx = random.choice([-1, 1]) * base_speed * speed_multiplier
-            self.speedy = random.choice([-1, 1]) * base_speed * speed_multiplier
-
-    def create_asteroid_image(self):
-        if self.size == 'large':
-            asteroid_img = pygame.Surface((80, 80), pygame.SRCALPHA)
-            color = (100, 100, 100)
-            radius = 40
-        elif self.size == 'medium':
-            asteroid_img = pygame.Surface((60, 60), pygame.SRCALPHA)
-            color = (130, 130, 130)
-            radius = 30
-        else:
-            asteroid_img = pygame.Surface((40, 40), pygame.SRCALPHA)
-            color = (160, 160, 160)
-            radius = 20
-
-        pygame.draw.circle(asteroid_img, color, (radius, radius), radius)
-        # Add crater details
-        num_craters = random.randint(3, 7)
-        for _ in range(num_craters):
-            crater_radius = random.randint(3, 6)
-            # Ensure crater centers are within the asteroid circle minus crater radius
-            angle = random.uniform(0, 360)
-            distance = random.uniform(0, radius - crater_radius - 2)  # Subtract 2 for padding
-            x = radius + int(distance * pygame.math.Vector2(1, 0).rotate(angle).x)
-            y = radius + int(distance * pygame.math.Vector2(1, 0).rotate(angle).y)
-            crater_color = (max(color[0] - 30, 0), max(color[1] - 30, 0), max(color[2] - 30, 0))
-            pygame.draw.circle(asteroid_img, crater_color, (x, y), crater_radius)
-        return asteroid_img
+            self.speedx = rng.spawn.choice([-1, 1]) * base_speed * speed_multiplier
+            self.speedy = rng.spawn.choice([-1, 1]) * base_speed * speed_multiplier
+
+    def join_world(self, world):
+        world.spawn(self, ENTITY_ASTEROID, pos=self.rect.center, vel=(self.speedx, self.speedy),
+                    jitter=ASTEROID_JITTER, rot=self.rot, rot_speed=self.rot_speed,
+                    next_rotation=sim_ticks + self.rotation_rate, rotation_interval=self.rotation_rate,
+                    radius=self.radius, size=self.rect.size, margin=ASTEROID_MARGIN, respawns=True)
+
+    def refresh_image(self, world):
+        self.rot = world.rot[self.entity]
+        self.image = rotate_image(self.image_orig, self.rot)
+        self.rect = self.image.get_rect()
+        world.size[self.entity] = self.rect.size
 
     def spawn_position(self):
-        side = random.choice(['top', 'bottom', 'left', 'right'])
+        side = rng.spawn.choice(['top', 'bottom', 'left', 'right'])
         buffer = 100
         if side == 'top':
-            self.rect.x = random.randrange(-buffer, WIDTH + buffer)
-            self.rect.y = random.randrange(-buffer * 2, -buffer)
+            self.rect.x = rng.spawn.randrange(-buffer, WIDTH + buffer)
+            self.rect.y = rng.spawn.randrange(-buffer * 2, -buffer)
         elif side == 'bottom':
-            self.rect.x = random.randrange(-buffer, WIDTH + buffer)
-            self.rect.y = random.randrange(HEIGHT + buffer, HEIGHT + buffer * 2)
+            self.rect.x = rng.spawn.randrange(-buffer, WIDTH + buffer)
+            self.rect.y = rng.spawn.randrange(HEIGHT + buffer, HEIGHT + buffer * 2)
         elif side == 'left':
-            self.rect.x = random.randrange(-buffer * 2, -buffer)
-            self.rect.y = random.randrange(-buffer, HEIGHT + buffer)
+            self.rect.x = rng.spawn.randrange(-buffer * 2, -buffer)
+            self.rect.y = rng.spawn.randrange(-buffer, HEIGHT + buffer)
         else:  # right
-            self.rect.x = random.randrange(WIDTH + buffer, WIDTH + buffer * 2)
-            self.rect.y = random.randrange(-buffer, HEIGHT + buffer)
+            self.rect.x = rng.spawn.randrange(WIDTH + buffer, WIDTH + buffer * 2)
+            self.rect.y = rng.spawn.randrange(-buffer, HEIGHT + buffer)
+
+    def join_scheduler(self, scheduler):
+        self.timer = scheduler.every(self.rotation_rate, self.rotate)
 
     def rotate(self):
         # Rotate asteroid
-        now = pygame.time.get_ticks()
-        if now - self.last_update > 50:
-            self.last_update = now
-            self.rot = (self.rot + self.rot_speed) % 360
-            new_image = pygame.transform.rotate(self.image_orig, self.rot)
-            old_center = self.rect.center
-            self.image = new_image
-            self.rect = self.image.get_rect()
-            self.rect.center = old_center
+        self.rot = (self.rot + self.rot_speed) % 360
+        new_image = rotate_image(self.image_orig, self.rot)
+        old_center = self.rect.center
+        self.image = new_image
+        self.rect = self.image.get_rect()
+        self.rect.center = old_center
+
+    def respawn(self):
+        self.spawn_position()
+        base_speed = rng.spawn.uniform(2, 4)  # Adjusted base speed range for faster asteroids
+        self.speedx = rng.spawn.uniform(-1, 1) * base_speed
+        self.speedy = rng.spawn.uniform(-1, 1) * base_speed
+        if self.speedx == 0 and self.speedy == 0:
+            self.speedx = rng.spawn.choice([-1, 1]) * base_speed
+            self.speedy = rng.spawn.choice([-1, 1]) * base_speed
+        self.image_orig = rng.spawn.choice(asteroid_textures[self.size])
+        self.image = self.image_orig
+        self.circle.place(self.rect.center)
 
     def update(self):
-        self.rotate()
         self.rect.x += self.speedx
         self.rect.y += self.speedy
         # Asteroid movement patterns
-        self.rect.x += random.uniform(-1, 1)
-        self.rect.y += random.uniform(-1, 1)
+        self.rect.x += rng.simulation.uniform(-ASTEROID_JITTER, ASTEROID_JITTER)
+        self.rect.y += rng.simulation.uniform(-ASTEROID_JITTER, ASTEROID_JITTER)
         # Reset position if off screen
-        if (self.rect.top > HEIGHT + 200 or self.rect.bottom < -200 or
-            self.rect.left > WIDTH + 200 or self.rect.right < -200):
-            self.spawn_position()
-            base_speed = random.uniform(2, 4)  # Adjusted base speed range for faster asteroids
-            self.speedx = random.uniform(-1, 1) * base_speed
-            self.speedy = random.uniform(-1, 1) * base_speed
-            if self.speedx == 0 and self.speedy == 0:
-                self.speedx = random.choice([-1, 1]) * base_speed
-                self.speedy = random.choice([-1, 1]) * base_speed
-            self.image_orig = self.create_asteroid_image()
-            self.image = self.image_orig.copy()
-
-class Explosion(pygame.sprite.Sprite):
-    def __init__(self, center):
-        super().__init__()
-        self.image = explosion_anim[0]
-        self.rect = self.image.get_rect()
-        self.rect.center = center
-        self.frame = 0
-        self.last_update = pygame.time.get_ticks()
-        self.frame_rate = 50  # Adjust for animation speed
-
-    def update(self):
-        now = pygame.time.get_ticks()
-        if now - self.last_update > self.frame_rate:
-            self.last_update = now
-            self.frame += 1
-            if self.frame == len(explosion_anim):
-                self.kill()
-            else:
-                center = self.rect.center
-                self.image = explosion_anim[self.frame]
-                self.rect = self.image.get_rect()
-                self.rect.center = center
-
-# High score functions
-def load_high_scores():
-    high_scores = []
-    if os.path.exists(HIGH_SCORES_FILE):
-        with open(HIGH_SCORES_FILE, 'r') as f:
-            for line in f:
-                # Strip any unwanted characters and check if line is a digit
-                line = line.strip()
-                # Skip empty lines
-                if not line:
-                    continue
-                # Remove commas and other non-digit characters
-                line = ''.join(filter(str.isdigit, line))
-                if line.isdigit():
-                    score = int(line)
-                    high_scores.append(score)
-    return high_scores
-
-def save_high_scores(high_scores):
-    with open(HIGH_SCORES_FILE, 'w') as f:
-        for score in high_scores:
-            f.write(f"{score}\n")
-
-def update_high_scores(new_score):
-    high_scores = load_high_scores()
-    high_scores.append(new_score)
-    high_scores.sort(reverse=True)
-    high_scores = high_scores[:5]  # Keep top 5 scores
-    save_high_scores(high_scores)
-
-# Game functions
-def show_menu():
-    global WIDTH, HEIGHT, screen, starfield
-    menu = True
-    clock = pygame.time.Clock()
-    title_font = load_font(72)
-    buttons = []
-
-    # Create buttons
-    play_button = Button((WIDTH / 2 - 100, HEIGHT / 2 - 100, 200, 50), "Play", main_game)
-    scores_button = Button((WIDTH / 2 - 100, HEIGHT / 2 - 40, 200, 50), "High Scores", high_scores_menu)
-    settings_button = Button((WIDTH / 2 - 100, HEIGHT / 2 + 20, 200, 50), "Settings", settings_menu)
-    quit_button = Button((WIDTH / 2 - 100, HEIGHT / 2 + 80, 200, 50), "Quit", sys.exit)
-    buttons.extend([play_button, scores_button, settings_button, quit_button])
-
-    while menu:
-        clock.tick(60)
-        mouse_pos = pygame.mouse.get_pos()
-        mouse_up = False
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                menu = False
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONUP:
-                mouse_up = True
-            elif event.type == pygame.VIDEORESIZE:
-                WIDTH, HEIGHT = event.w, event.h
-                screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
-                starfield = create_starfield()
-                # Update button positions
-                play_button.rect.topleft = (WIDTH / 2 - 100, HEIGHT / 2 - 100)
-                play_button.text_rect.center = play_button.rect.center
-                scores_button.rect.topleft = (WIDTH / 2 - 100, HEIGHT / 2 - 40)
-                scores_button.text_rect.center = scores_button.rect.center
-                settings_button.rect.topleft = (WIDTH / 2 - 100, HEIGHT / 2 + 20)
-                settings_button.text_rect.center = settings_button.rect.center
-                quit_button.rect.topleft = (WIDTH / 2 - 100, HEIGHT / 2 + 80)
-                quit_button.text_rect.center = quit_button.rect.center
-
-        screen.fill((10, 10, 30))
-        draw_starfield()
-
-        title_text = title_font.render("ASTEROID DODGER", True, WHITE)
-        title_rect = title_text.get_rect(center=(WIDTH / 2, HEIGHT / 3 - 50))
-        screen.blit(title_text, title_rect)
-
-        for button in buttons:
-            button.update(mouse_pos, mouse_up)
-            button.draw(screen)
-
-        pygame.display.flip()
-
-def settings_menu():
-    global bg_music_volume, effects_volume, WIDTH, HEIGHT, screen, starfield
-    settings = True
-    title_font = load_font(72)
-    menu_font = load_font(36)
-    clock = pygame.time.Clock()
-    slider_dragging = None  # To keep track of which slider is being dragged
-
-    # Slider positions and dimensions
-    slider_width = 300
-    slider_height = 20
-    bg_slider_rect = pygame.Rect((WIDTH / 2 - slider_width / 2, HEIGHT / 2 - 50), (slider_width, slider_height))
-    effects_slider_rect = pygame.Rect((WIDTH / 2 - slider_width / 2, HEIGHT / 2 + 50), (slider_width, slider_height))
-
-    # Initial handle positions
-    bg_handle_x = bg_slider_rect.x + bg_music_volume * slider_width - 10
-    bg_handle_rect = pygame.Rect(bg_handle_x, bg_slider_rect.y - 5, 20, slider_height + 10)
-    effects_handle_x = effects_slider_rect.x + effects_volume * slider_width - 10
-    effects_handle_rect = pygame.Rect(effects_handle_x, effects_slider_rect.y - 5, 20, slider_height + 10)
-
-    while settings:
-        clock.tick(60)
-        mouse_pos = pygame.mouse.get_pos()
-        mouse_up = False
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                settings = False
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONDOWN:
-                if bg_handle_rect.collidepoint(event.pos):
-                    slider_dragging = 'bg'
-                elif effects_handle_rect.collidepoint(event.pos):
-                    slider_dragging = 'effects'
-            elif event.type == pygame.MOUSEBUTTONUP:
-                slider_dragging = None
-                mouse_up = True
-            elif event.type == pygame.MOUSEMOTION:
-                if slider_dragging == 'bg':
-                    # Update background music volume
-                    mouse_x = event.pos[0]
-                    relative_x = mouse_x - bg_slider_rect.x
-                    bg_music_volume = max(0, min(relative_x / slider_width, 1))
-                    if pygame.mixer.music:
-                        pygame.mixer.music.set_volume(bg_music_volume)
-                    # Update handle position
-                    bg_handle_x = bg_slider_rect.x + bg_music_volume * slider_width - 10
-                    bg_handle_rect.x = bg_handle_x
-                elif slider_dragging == 'effects':
-                    # Update sound effects volume
-                    mouse_x = event.pos[0]
-                    relative_x = mouse_x - effects_slider_rect.x
-                    effects_volume = max(0, min(relative_x / slider_width, 1))
-                    # Update handle position
-                    effects_handle_x = effects_slider_rect.x + effects_volume * slider_width - 10
-                    effects_handle_rect.x = effects_handle_x
-            elif event.type == pygame.VIDEORESIZE:
-                WIDTH, HEIGHT = event.w, event.h
-                screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
-                starfield = create_starfield()
-                # Update slider positions
-                bg_slider_rect.x = WIDTH / 2 - slider_width / 2
-                bg_slider_rect.y = HEIGHT / 2 - 50
-                effects_slider_rect.x = WIDTH / 2 - slider_width / 2
-                effects_slider_rect.y = HEIGHT / 2 + 50
-                # Update handle positions based on current volume
-                bg_handle_x = bg_slider_rect.x + bg_music_volume * slider_width - 10
-                bg_handle_rect.topleft = (bg_handle_x, bg_slider_rect.y - 5)
-                effects_handle_x = effects_slider_rect.x + effects_volume * slider_width - 10
-                effects_handle_rect.topleft = (effects_handle_x, effects_slider_rect.y - 5)
-
-        screen.fill((10, 10, 30))
-        draw_starfield()
-
-        title_text = title_font.render("SETTINGS", True, WHITE)
-        title_rect = title_text.get_rect(center=(WIDTH / 2, HEIGHT / 3 - 50))
-        screen.blit(title_text, title_rect)
-
-        # Background Music Slider
-        bg_text = menu_font.render("Background Music Volume", True, WHITE)
-        bg_text_rect = bg_text.get_rect(center=(WIDTH / 2, HEIGHT / 2 - 80))
-        screen.blit(bg_text, bg_text_rect)
-        pygame.draw.rect(screen, DARK_GRAY, bg_slider_rect)
-        # Draw the slider handle
-        pygame.draw.rect(screen, GRAY, bg_handle_rect)
+        if (self.rect.top > HEIGHT + ASTEROID_MARGIN or self.rect.bottom < -ASTEROID_MARGIN or
+            self.rect.left > WIDTH + ASTEROID_MARGIN or self.rect.right < -ASTEROID_MARGIN):
+            self.respawn()
+        else:
+            self.circle.move_to(self.rect.center)
+
+def animate_world(world):
+    # Animation and lifetime systems: advance frames and end finished animations
+    advanced, finished = world.animation(sim_ticks)
+    owners = world.owners
+    for row in advanced:
+        owners[row].refresh_image(world)
+    for owner in [owners[row] for row in finished]:
+        world.destroy(owner)
+        owner.kill()
+
+def update_world(world):
+    # Batched replacement for calling update() on every laser, asteroid and explosion
+    world.movement()
+    rotated = world.rotation(sim_ticks)
+    respawned, left = world.bounds(WIDTH, HEIGHT)
+    owners = world.owners
+    for row in respawned:
+        asteroid = owners[row]
+        asteroid.respawn()
+        world.set(row, pos=asteroid.rect.center, prev_pos=asteroid.rect.center,
+                  vel=(asteroid.speedx, asteroid.speedy), size=asteroid.rect.size)
+    for row in rotated:
+        owners[row].refresh_image(world)
+    for owner in [owners[row] for row in left]:
+        world.destroy(owner)
+        owner.kill()
+    animate_world(world)
+    # Sync the sprite views with the simulated positions
+    for owner, center in zip(world.owners, world.pos[:world.count].tolist()):
+        owner.rect.center = center
+
+# Recycles destroyed asteroids instead of constructing new ones
+class AsteroidPool:
+    def __init__(self):
+        self.free = []
 
-        # Sound Effects Slider
-        effects_text = menu_font.render("Sound Effects Volume", True, WHITE)
-        effects_text_rect = effects_text.get_rect(center=(WIDTH / 2, HEIGHT / 2 + 20))
-        screen.blit(effects_text, effects_text_rect)
-        pygame.draw.rect(screen, DARK_GRAY, effects_slider_rect)
-        # Draw the slider handle
-        pygame.draw.rect(screen, GRAY, effects_handle_rect)
+    def acquire(self, speed_multiplier):
+        if self.free:
+            asteroid = self.free.pop()
+            asteroid.reset(speed_multiplier)
+        else:
+            asteroid = Asteroid(speed_multiplier)
+        return asteroid
 
-        # Back Button
-        back_button = Button((WIDTH / 2 - 100, HEIGHT - 80, 200, 50), "Back", show_menu)
-        back_button.update(mouse_pos, mouse_up)
-        back_button.draw(screen)
+    def release(self, asteroid):
+        asteroid.kill()
+        if asteroid.timer is not None:
+            asteroid.timer.cancel()
+            asteroid.timer = None
+        self.free.append(asteroid)
 
-        pygame.display.flip()
+asteroid_pool = AsteroidPool()
 
-def high_scores_menu():
-    global WIDTH, HEIGHT, screen, starfield
-    menu = True
-    clock = pygame.time.Clock()
-    title_font = load_font(72)
-    score_font = load_font(36)
-    high_scores = load_high_scores()
+class Explosion(TransientEntity):
+    __slots__ = ('frame', 'frame_rate')
 
-    back_button = Button((WIDTH / 2 - 100, HEIGHT - 80, 200, 50), "Back", show_menu)
+    def __init__(self, center):
+        self.group = None
+        self.reset(center)
 
-    while menu:
-        clock.tick(60)
-        mouse_pos = pygame.mouse.get_pos()
-        mouse_up = False
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                menu = False
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONUP:
-                mouse_up = True
-            elif event.type == pygame.VIDEORESIZE:
-                WIDTH, HEIGHT = event.w, event.h
-                screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
-                starfield = create_starfield()
-                back_button.rect.topleft = (WIDTH / 2 - 100, HEIGHT - 80)
-                back_button.text_rect.center = back_button.rect.center
-
-        screen.fill((10, 10, 30))
-        draw_starfield()
-
-        title_text = title_font.render("HIGH SCORES", True, WHITE)
-        title_rect = title_text.get_rect(center=(WIDTH / 2, HEIGHT / 3 - 50))
-        screen.blit(title_text, title_rect)
+    def reset(self, center):
+        self.image = explosion_anim[0]
+        self.rect = self.image.get_rect()
+        self.rect.center = center
+        self.prev_center = self.rect.center
+        self.frame = 0
+        self.frame_rate = 50  # Adjust for animation speed
+        self.entity = None  # Row in the World when simulated by the ECS systems
+        self.timer = None  # Animation timer when updated as a sprite
 
-        # Display high scores
-        y_offset = HEIGHT / 3
-        for i, score in enumerate(high_scores):
-            if i >= 5:
-                break
-            score_text = score_font.render(f"{i + 1}. {score}", True, WHITE)
-            score_rect = score_text.get_rect(center=(WIDTH / 2, y_offset + i * 40))
-            screen.blit(score_text, score_rect)
+    def join_world(self, world):
+        world.spawn(self, ENTITY_EXPLOSION, pos=self.rect.center, size=self.rect.size,
+                    frame_count=len(explosion_anim), next_frame=sim_ticks + self.frame_rate,
+                    frame_interval=self.frame_rate)
 
-        back_button.update(mouse_pos, mouse_up)
-        back_button.draw(screen)
+    def join_scheduler(self, scheduler):
+        self.timer = scheduler.every(self.frame_rate, self.next_frame)
 
-        pygame.display.flip()
+    def refresh_image(self, world):
+        self.frame = world.frame[self.entity]
+        self.image = explosion_anim[self.frame]
+        self.rect = self.image.get_rect()
+        world.size[self.entity] = self.rect.size
 
-def game_over_screen(score):
-    global WIDTH, HEIGHT, screen, starfield
-    menu = True
-    clock = pygame.time.Clock()
-    title_font = load_font(72)
-    font = load_font(36)
-    buttons = []
-
-    # Update high scores
-    update_high_scores(score)
-
-    # Create buttons
-    play_button = Button((WIDTH / 2 - 100, HEIGHT / 2 + 70, 200, 50), "Play Again", main_game)
-    settings_button = Button((WIDTH / 2 - 100, HEIGHT / 2 + 140, 200, 50), "Settings", settings_menu)
-    scores_button = Button((WIDTH / 2 - 100, HEIGHT / 2 + 210, 200, 50), "High Scores", high_scores_menu)
-    quit_button = Button((WIDTH / 2 - 100, HEIGHT / 2 + 280, 200, 50), "Quit", sys.exit)
-    buttons.extend([play_button, settings_button, scores_button, quit_button])
-
-    while menu:
-        clock.tick(60)
-        mouse_pos = pygame.mouse.get_pos()
-        mouse_up = False
-
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                menu = False
-                pygame.quit()
-                sys.exit()
-            elif event.type == pygame.MOUSEBUTTONUP:
-                mouse_up = True
-            elif event.type == pygame.VIDEORESIZE:
-                WIDTH, HEIGHT = event.w, event.h
-                screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
-                starfield = create_starfield()
-                for button in buttons:
-                    if button.text == "Play Again":
-                        button.rect.topleft = (WIDTH / 2 - 100, HEIGHT / 2 + 70)
-                        button.text_rect.center = button.rect.center
-                    elif button.text == "Settings":
-                        button.rect.topleft = (WIDTH / 2 - 100, HEIGHT / 2 + 140)
-                        button.text_rect.center = button.rect.center
-                    elif button.text == "High Scores":
-                        button.rect.topleft = (WIDTH / 2 - 100, HEIGHT / 2 + 210)
-                        button.text_rect.center = button.rect.center
-                    elif button.text == "Quit":
-                        button.rect.topleft = (WIDTH / 2 - 100, HEIGHT / 2 + 280)
-                        button.text_rect.center = button.rect.center
-
-        screen.fill((10, 10, 30))
-        draw_starfield()
-
-        game_over_text = title_font.render("GAME OVER", True, (255, 0, 0))
-        game_over_rect = game_over_text.get_rect(center=(WIDTH / 2, HEIGHT / 3 - 50))
-        screen.blit(game_over_text, game_over_rect)
+    def next_frame(self):
+        self.frame += 1
+        if self.frame == len(explosion_anim):
+            self.kill()
+        else:
+            center = self.rect.center
+            self.image = explosion_anim[self.frame]
+            self.rect = self.image.get_rect()
+            self.rect.center = center
+
+Laser.pool = EntityPool(Laser)
+Explosion.pool = EntityPool(Explosion)
+
+# Uniform grid spatial hash used as the collision broad phase
+SPATIAL_CELL_SIZE = 100
+
+class SpatialHash:
+    def __init__(self, cell_size=SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+
+    def cells_for(self, rect):
+        size = self.cell_size
+        for cx in range(rect.left // size, (rect.right - 1) // size + 1):
+            for cy in range(rect.top // size, (rect.bottom - 1) // size + 1):
+                yield (cx, cy)
+
+    def rebuild(self, sprites):
+        self.cells.clear()
+        for sprite in sprites:
+            for cell in self.cells_for(sprite.rect):
+                self.cells.setdefault(cell, []).append(sprite)
+
+    def candidates(self, rect):
+        # Dict keys keep insertion order and drop sprites spanning several cells
+        found = {}
+        for cell in self.cells_for(rect):
+            for sprite in self.cells.get(cell, ()):
+                found[sprite] = None
+        return found
+
+    def collide_group(self, group, dokill_hashed, dokill_group, collided=None, query=None):
+        # Same contract as pygame.sprite.groupcollide(hashed, group, ...); query gives
+        # the rect to look up for each sprite when it reaches beyond its own rect
+        hits = {}
+        for sprite in group.sprites():
+            for other in self.candidates(query(sprite) if query else sprite.rect):
+                if dokill_hashed and not other.alive():
+                    continue
+                if collided(other, sprite) if collided else other.rect.colliderect(sprite.rect):
+                    hits.setdefault(other, []).append(sprite)
+                    if dokill_group:
+                        sprite.kill()
+                        break
+        if dokill_hashed:
+            for other in hits:
+                other.kill()
+        return hits
+
+# Screen renderer: stars are drawn onto a background surface and static UI onto an
+# overlay that is only rebuilt when its key changes. With DIRTY_RECTS only the
+# regions that changed are pushed to the display, otherwise the frame is flipped.
+class DirtyRenderer:
+    def __init__(self):
+        self.background = None
+        self.overlay = None
+        self.overlay_key = None
+        self.star_rects = []
+        self.changed_star_rects = []
+        self.rects = []
+        self.full_redraw = True
+
+    def invalidate(self):
+        self.full_redraw = True
+
+    def set_overlay(self, key, draw):
+        size = screen.get_size()
+        if key == self.overlay_key and (self.overlay is None or self.overlay.get_size() == size):
+            return
+        self.overlay_key = key
+        self.overlay = None
+        if draw is not None:
+            self.overlay = pygame.Surface(size, pygame.SRCALPHA)
+            draw(self.overlay)
+            self.overlay = self.overlay.convert_alpha()
+        self.full_redraw = True
+
+    def draw_background(self):
+        if self.background is None or self.background.get_size() != screen.get_size():
+            self.background = pygame.Surface(screen.get_size()).convert()
+            self.background.fill(BACKGROUND_COLOR)
+            self.star_rects = []
+            self.full_redraw = True
+        for rect in self.star_rects:
+            self.background.fill(BACKGROUND_COLOR, rect)
+        new_rects = draw_starfield(self.background)
+        self.changed_star_rects = self.star_rects + new_rects
+        self.star_rects = new_rects
+        if self.full_redraw or not DIRTY_RECTS:
+            screen.blit(self.background, (0, 0))
+        else:
+            self.restore(self.changed_star_rects)
 
-        score_text = font.render(f"Final Score: {score}", True, WHITE)
-        score_rect = score_text.get_rect(center=(WIDTH / 2, HEIGHT / 2 - 50))
-        screen.blit(score_text, score_rect)
+    def draw_overlay(self):
+        if self.overlay is None:
+            return
+        if self.full_redraw or not DIRTY_RECTS:
+            screen.blit(self.overlay, (0, 0))
+        else:
+            for rect in self.changed_star_rects:
+                screen.blit(self.overlay, rect, rect)
 
-        for button in buttons:
-            button.update(mouse_pos, mouse_up)
-            button.draw(screen)
+    def restore(self, rects):
+        # Repaint the background over regions that are about to be redrawn
+        for rect in rects:
+            screen.blit(self.background, rect, rect)
+        self.rects.extend(rects)
 
-        pygame.display.flip()
+    def mark(self, rects):
+        self.rects.extend(rects)
 
-def draw_starfield():
+    def present(self):
+        if self.full_redraw or not DIRTY_RECTS:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.rects)
+        self.rects = []
+        self.full_redraw = False
+
+# High scores; the database is opened on first use so headless runs don't create it
+leaderboard = None
+
+def open_leaderboard():
+    global leaderboard
+    if leaderboard is None:
+        leaderboard = Leaderboard(LEADERBOARD_FILE)
+        if not len(leaderboard) and os.path.exists(HIGH_SCORES_FILE):
+            leaderboard.import_text(HIGH_SCORES_FILE, os.path.basename(HIGH_SCORES_FILE))
+    return leaderboard
+
+def replay_flags():
+    flags = FLAG_PIXEL_PERFECT if PIXEL_PERFECT else 0
+    if World is not None:
+        flags |= FLAG_ECS
+    return flags
+
+def draw_starfield(surface):
     global starfield
-    for star in starfield:
+    rects = []
+    buckets = rng.cosmetic.integers(len(starfield), STAR_ALPHA_BUCKETS)
+    for star, bucket in zip(starfield, buckets):
         x, y, speed, size = star
 
-        # Twinkle effect with variable star sizes
-        alpha = random.randint(150, 255)
-        star_surface = pygame.Surface((size, size), pygame.SRCALPHA)
-        star_surface.set_alpha(alpha)
-        pygame.draw.circle(star_surface, WHITE, (size//2, size//2), size//2)
-        screen.blit(star_surface, (int(x), int(y)))
+        # Twinkle effect with variable star sizes, blitted from the atlas
+        rects.append(surface.blit(star_atlas[(size, bucket)], (int(x), int(y))))
 
         # Move star
         y += speed
         if y > HEIGHT:
-            x = random.randrange(0, WIDTH)
-            y = random.randrange(-20, -5)
-            speed = random.uniform(1, 3)
-            size = random.choice([2, 3, 4])  # Reassign size when respawning
+            x = rng.cosmetic.randrange(0, WIDTH)
+            y = rng.cosmetic.randrange(-20, -5)
+            speed = rng.cosmetic.uniform(1, 3)
+            size = rng.cosmetic.choice(STAR_SIZES)  # Reassign size when respawning
             star[:] = [x, y, speed, size]
         else:
             star[1] = y
-
-def main_game():
-    global all_sprites, asteroids, lasers, WIDTH, HEIGHT, screen, starfield, bg_music_volume, effects_volume
-    clock = pygame.time.Clock()
-    running = True
-    paused = False
-    score = 0
-    start_ticks = pygame.time.get_ticks()
-    total_pause_time = 0
-    pause_start_time = 0
-    asteroid_spawn_interval = 1500  # Decreased initial spawn interval for more asteroids
-    asteroid_spawn_timer = pygame.time.get_ticks()
-    asteroid_base_speed = 1.5  # Increased starting base speed for asteroids
-
-    # Sprite groups
-    all_sprites = pygame.sprite.Group()
-    asteroids = pygame.sprite.Group()
-    lasers = pygame.sprite.Group()
-    explosions = pygame.sprite.Group()
-    player = Player()
-    all_sprites.add(player)
-
-    # Spawn initial asteroids
-    for _ in range(10):  # Initial asteroid count
-        asteroid = Asteroid(asteroid_base_speed)
-        all_sprites.add(asteroid)
-        asteroids.add(asteroid)
-
-    # Play background music (if available)
-    if pygame.mixer.music:
-        pygame.mixer.music.set_volume(bg_music_volume)
-        pygame.mixer.music.play(loops=-1)
-
-    def pause_game():
-        nonlocal paused, pause_start_time, total_pause_time
-        if not paused:
-            # Game is being paused
-            pause_start_time = pygame.time.get_ticks()
+    return rects
+
+# Interpolation between the last two simulation steps for rendering
+def store_previous_positions(sprites):
+    for sprite in sprites:
+        sprite.prev_center = sprite.rect.center
+
+def interpolate_positions(sprites, alpha):
+    # Moves sprites to their render positions and returns the simulated centers
+    sim_centers = []
+    for sprite in sprites:
+        x, y = sprite.rect.center
+        sim_centers.append((x, y))
+        prev_x, prev_y = getattr(sprite, 'prev_center', (x, y))
+        if abs(x - prev_x) + abs(y - prev_y) < TELEPORT_DISTANCE:
+            sprite.rect.center = (prev_x + (x - prev_x) * alpha, prev_y + (y - prev_y) * alpha)
+    return sim_centers
+
+def restore_positions(sprites, sim_centers):
+    for sprite, center in zip(sprites, sim_centers):
+        sprite.rect.center = center
+
+def read_keyboard_input():
+    keystate = pygame.key.get_pressed()
+    inputs = 0
+    if keystate[pygame.K_LEFT] or keystate[pygame.K_a]:
+        inputs |= INPUT_LEFT
+    if keystate[pygame.K_RIGHT] or keystate[pygame.K_d]:
+        inputs |= INPUT_RIGHT
+    if keystate[pygame.K_UP] or keystate[pygame.K_w]:
+        inputs |= INPUT_UP
+    if keystate[pygame.K_DOWN] or keystate[pygame.K_s]:
+        inputs |= INPUT_DOWN
+    if keystate[pygame.K_z]:
+        inputs |= INPUT_ROTATE_LEFT
+    if keystate[pygame.K_x]:
+        inputs |= INPUT_ROTATE_RIGHT
+    return inputs
+
+# A GameSession at one step, as flat arrays of numbers: no Surfaces or sprites, so
+# one can be taken every step into a RingBuffer and pickling it is cheap. Entities
+# are stored as fixed-size records with the fields below; images are looked up
+# again from the stored size class, texture, frame and angle on restore. Timers are
+# stored as their due time and their position in the run order (-1 when not
+# pending), so timers due at the same time still run in the same order.
+SESSION_FIELDS = ('ticks', 'steps', 'score', 'kills', 'game_over', 'spawn_interval', 'last_spawn', 'base_speed',
+                  'spawning', 'spawn_time', 'spawn_order', 'speed_time', 'speed_order', 'interval_time',
+                  'interval_order')
+PLAYER_FIELDS = ('x', 'y', 'w', 'h', 'prev_x', 'prev_y', 'rot', 'energy', 'last_move_time', 'move_x', 'move_y')
+ASTEROID_FIELDS = ('x', 'y', 'w', 'h', 'prev_x', 'prev_y', 'size', 'texture', 'rotated', 'rot', 'rot_speed',
+                   'speed_x', 'speed_y', 'move_x', 'move_y', 'timer_time', 'timer_order', 'entity')
+LASER_FIELDS = ('x', 'y', 'w', 'h', 'prev_x', 'prev_y', 'angle', 'frame', 'move_x', 'move_y',
+                'timer_time', 'timer_order', 'entity')
+EXPLOSION_FIELDS = ('x', 'y', 'w', 'h', 'prev_x', 'prev_y', 'frame', 'timer_time', 'timer_order', 'entity')
+
+class GameState:
+    __slots__ = ('session', 'player', 'asteroids', 'lasers', 'explosions', 'world', 'rng')
+
+    def __init__(self, session, player, asteroids, lasers, explosions, world, rng):
+        self.session = session
+        self.player = player
+        self.asteroids = asteroids
+        self.lasers = lasers
+        self.explosions = explosions
+        self.world = world  # Component arrays of the ECS World, or None
+        self.rng = rng
+
+    def to_bytes(self):
+        return pickle.dumps(tuple(getattr(self, name) for name in self.__slots__), pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(*pickle.loads(data))
+
+def records(data, fields):
+    # Splits a flat array back into one tuple per entity
+    stride = len(fields)
+    return [tuple(data[i:i + stride]) for i in range(0, len(data), stride)]
+
+# One play-through of the game rules, advanced one fixed step at a time. It
+# doesn't read the keyboard or the clock, so it can also run headless.
+class GameSession:
+    def __init__(self, seed=None, initial_asteroids=None):
+        global sim_ticks
+        if seed is not None:
+            rng.reseed(seed)
+        self.seed = seed
+        self.ticks = 0
+        sim_ticks = 0  # Every game starts its clock at zero, whatever ran before it
+        self.steps = 0
+        self.score = 0
+        self.kills = 0
+        self.game_over = False
+        self.asteroid_spawn_interval = SPAWN_INTERVAL_START
+        self.asteroid_spawn_timer = 0
+        self.asteroid_base_speed = ASTEROID_SPEED_START
+        self.spawning = True  # Timed spawns; the benchmark turns them off to hold the count steady
+
+        # Sprite groups
+        self.all_sprites = pygame.sprite.LayeredDirty() if DIRTY_RECTS else pygame.sprite.Group()
+        self.asteroids = pygame.sprite.Group()
+        self.lasers = EntityGroup()
+        self.explosions = EntityGroup()
+        self.player = Player()
+        self.all_sprites.add(self.player)
+        self.asteroid_grid = SpatialHash()  # Collision broad phase when the ECS is unavailable
+        self.world = World(seed=rng.simulation.generator) if World is not None else None
+        self.hud_rects = []
+        self.effect_rects = []  # Where lasers and explosions were drawn last frame
+
+        # Timed events: difficulty steps, asteroid spawns and, without the ECS, animation
+        self.scheduler = Scheduler()
+        self.speed_timer = self.scheduler.every(ASTEROID_SPEED_PERIOD, self.increase_asteroid_speed)
+        self.interval_timer = self.scheduler.every(SPAWN_INTERVAL_PERIOD, self.shorten_spawn_interval)
+        self.spawn_timer = self.scheduler.schedule(self.asteroid_spawn_interval, self.timed_spawn)
+
+        # Spawn initial asteroids
+        if initial_asteroids is None:
+            initial_asteroids = INITIAL_ASTEROIDS
+        for _ in range(initial_asteroids):
+            self.spawn_asteroid()
+
+    def spawn_asteroid(self):
+        asteroid = asteroid_pool.acquire(self.asteroid_base_speed)
+        self.all_sprites.add(asteroid)
+        self.asteroids.add(asteroid)
+        if self.world is not None:
+            asteroid.join_world(self.world)
         else:
-            # Game is being unpaused
-            total_pause_time += pygame.time.get_ticks() - pause_start_time
-        paused = not paused
-
-    def update_screen_size(new_width, new_height):
-        global WIDTH, HEIGHT, screen, starfield
-        WIDTH, HEIGHT = new_width, new_height
-        screen = pygame.display.set_mode((WIDTH, HEIGHT), pygame.RESIZABLE)
-        starfield = create_starfield()
-
-    while running:
-        clock.tick(60)
-
-        if not paused:
-            mouse_pos = pygame.mouse.get_pos()
-            mouse_up = False
+            asteroid.join_scheduler(self.scheduler)
+
+    def timed_spawn(self):
+        # Spawn new asteroids at intervals
+        self.asteroid_spawn_timer = self.scheduler.now
+        if self.spawning:
+            self.spawn_asteroid()
+        self.spawn_timer = self.scheduler.schedule(self.asteroid_spawn_interval, self.timed_spawn)
+
+    def increase_asteroid_speed(self):
+        # Increase asteroid base speed over time
+        self.asteroid_base_speed = (ASTEROID_SPEED_START +
+                                    (self.scheduler.now // ASTEROID_SPEED_PERIOD) * ASTEROID_SPEED_STEP)
+
+    def shorten_spawn_interval(self):
+        # Decrease asteroid spawn interval over time to increase difficulty
+        self.asteroid_spawn_interval = max(SPAWN_INTERVAL_MIN, SPAWN_INTERVAL_START -
+                                           (self.scheduler.now // SPAWN_INTERVAL_PERIOD) * SPAWN_INTERVAL_STEP)
+        # Move the pending spawn to match the new interval
+        self.spawn_timer.cancel()
+        self.spawn_timer = self.scheduler.schedule_at(self.asteroid_spawn_timer + self.asteroid_spawn_interval,
+                                                      self.timed_spawn)
+
+    def add_explosion(self, center):
+        explosion = Explosion.pool.acquire(center)
+        self.explosions.add(explosion)
+        if self.world is not None:
+            explosion.join_world(self.world)
+        else:
+            explosion.join_scheduler(self.scheduler)
+        if collision_sound:
+            collision_sound.set_volume(effects_volume)
+            collision_sound.play()
+
+    def step(self, inputs):
+        self.update(inputs)
+        self.collide()
+
+    def update(self, inputs):
+        global sim_ticks
+        self.steps += 1
+        self.ticks += SIM_STEP
+        sim_ticks = self.ticks
+        store_previous_positions(self.sprites())
+
+        # Run the timers that are due (simulation time already excludes pauses)
+        self.scheduler.run_until(self.ticks)
+
+        if inputs & INPUT_SHOOT:
+            laser = self.player.shoot()
+            if laser:
+                self.lasers.add(laser)
+                if self.world is not None:
+                    laser.join_world(self.world)
+                else:
+                    laser.join_scheduler(self.scheduler)
+
+        # Update
+        self.player.inputs = inputs
+        self.player.update()
+        if self.world is not None:
+            update_world(self.world)  # Asteroids and lasers move as whole arrays, without an update() call each
+        else:
+            self.asteroids.update()
+            self.lasers.update()
+
+        # Calculate score
+        self.score = int(self.ticks // 100)
+
+    def end_game(self):
+        # The ship explodes and the difficulty stops changing, so no more asteroids spawn
+        self.add_explosion(self.player.rect.center)
+        self.game_over = True
+        self.spawn_timer.cancel()
+        self.speed_timer.cancel()
+        self.interval_timer.cancel()
+
+    def update_explosions(self):
+        # Only the explosions keep playing once the game is over
+        if self.world is not None:
+            animate_world(self.world)
+        else:
+            self.scheduler.run_until(sim_ticks)
+
+    def collide(self):
+        if self.world is not None:
+            self.collide_world()
+            return
+        # Check for collisions between lasers and asteroids: grid broad phase, then the
+        # laser's swept path against the asteroid circle so fast lasers can't tunnel through
+        if self.lasers:
+            self.asteroid_grid.rebuild(self.asteroids)
+            laser_hits = self.asteroid_grid.collide_group(self.lasers, True, True, collide_swept_segment,
+                                                          Laser.swept_rect)
+            for hit in laser_hits:
+                asteroid_pool.release(hit)
+                self.add_explosion(hit.rect.center)
+                self.kills += 1
+                # Optionally, increase score when destroying asteroids
+                self.score += 50
+
+        # Check for collisions between player and asteroids
+        hits = circle_hits(self.player.circle, self.asteroids)
+        if hits and PIXEL_PERFECT:
+            hits = [hit for hit in hits if collide_masks(self.player, hit)]
+        if hits:
+            self.end_game()
+
+    def collide_world(self):
+        # Collision system over the component arrays, same rules as collide()
+        world = self.world
+        for hit, lasers in world.collide_segments(ENTITY_ASTEROID, ENTITY_LASER):
+            for laser in lasers:
+                world.destroy(laser)
+                laser.kill()
+            world.destroy(hit)
+            asteroid_pool.release(hit)
+            self.add_explosion(hit.rect.center)
+            self.kills += 1
+            # Optionally, increase score when destroying asteroids
+            self.score += 50
+
+        # Check for collisions between player and asteroids
+        circle = self.player.circle
+        hits = world.collide_circle((circle.x, circle.y), circle.radius, ENTITY_ASTEROID)
+        if hits and PIXEL_PERFECT:
+            hits = [hit for hit in hits if collide_masks(self.player, hit)]
+        if hits:
+            self.end_game()
+
+    def sprites(self):
+        return self.all_sprites.sprites() + self.lasers.sprites() + self.explosions.sprites()
+
+    def draw(self, renderer, alpha=1.0):
+        # Draw/render between the last two steps
+        sprites = self.sprites()
+        sim_centers = interpolate_positions(sprites, alpha)
+        renderer.set_overlay(None, None)
+        renderer.draw_background()
+        if DIRTY_RECTS:
+            # Layers keep the player above asteroids; lasers and explosions aren't
+            # in the LayeredDirty group, so their last rects are repainted here
+            renderer.restore(self.hud_rects + self.effect_rects)
+            renderer.mark(self.all_sprites.draw(screen, renderer.background))
+            self.effect_rects = self.lasers.draw(screen)
+            self.effect_rects.append(self.player.draw(screen))
+            self.effect_rects += self.explosions.draw(screen)
+            renderer.mark(self.effect_rects)
+        else:
+            self.all_sprites.draw(screen)
+            self.lasers.draw(screen)
+            self.player.draw(screen)
+            self.explosions.draw(screen)
+
+        # Draw energy bar
+        energy_rect = pygame.draw.rect(screen, WHITE, (WIDTH - 30, 10, 20, 100), 2)
+        energy_height = int(self.player.energy)
+        pygame.draw.rect(screen, (0, 255, 0), (WIDTH - 28, 110 - energy_height, 16, energy_height))
+
+        # Draw score
+        score_text = render_text(load_font(24), f"Score: {self.score}", WHITE)
+        score_rect = screen.blit(score_text, (10, 10))
+
+        self.hud_rects = [energy_rect, score_rect]
+        renderer.mark(self.hud_rects)
+        renderer.present()
+        restore_positions(sprites, sim_centers)
+
+    def convert_images(self, converted):
+        # Point sprites in play at the converted copies of their images
+        for sprite in self.sprites():
+            sprite.image = converted.get(sprite.image, sprite.image)
+            if hasattr(sprite, "image_orig"):
+                sprite.image_orig = converted.get(sprite.image_orig, sprite.image_orig)
+
+    def close(self):
+        # Return the remaining asteroids, lasers and explosions to their pools
+        for asteroid in self.asteroids.sprites():
+            asteroid_pool.release(asteroid)
+        self.lasers.empty()
+        self.explosions.empty()
+
+    def snapshot(self):
+        order = {timer: index for index, timer in enumerate(self.scheduler.timers())}
+
+        def timer_fields(timer):
+            if timer not in order:
+                return (-1, -1)
+            return (timer.time, order[timer])
+
+        def common_fields(sprite):
+            prev = getattr(sprite, 'prev_center', sprite.rect.center)
+            return (*sprite.rect, *prev)
+
+        def entity_row(owner):
+            return -1 if owner.entity is None else owner.entity
+
+        session = array('d', (self.ticks, self.steps, self.score, self.kills, self.game_over,
+                              self.asteroid_spawn_interval, self.asteroid_spawn_timer, self.asteroid_base_speed,
+                              self.spawning, *timer_fields(self.spawn_timer), *timer_fields(self.speed_timer),
+                              *timer_fields(self.interval_timer)))
+        player = self.player
+        player_data = array('d', (*common_fields(player), player.rot, player.energy, player.last_move_time,
+                                  player.circle.mx, player.circle.my))
+        asteroids = array('d')
+        for asteroid in self.asteroids:
+            asteroids.extend((*common_fields(asteroid), ASTEROID_SIZE_NAMES.index(asteroid.size),
+                              asteroid_textures[asteroid.size].index(asteroid.image_orig),
+                              asteroid.image is not asteroid.image_orig, asteroid.rot, asteroid.rot_speed,
+                              asteroid.speedx, asteroid.speedy, asteroid.circle.mx, asteroid.circle.my,
+                              *timer_fields(asteroid.timer), entity_row(asteroid)))
+        lasers = array('d')
+        for laser in self.lasers:
+            lasers.extend((*common_fields(laser), laser.angle, laser.frame, laser.segment.mx, laser.segment.my,
+                           *timer_fields(laser.timer), entity_row(laser)))
+        explosions = array('d')
+        for explosion in self.explosions:
+            explosions.extend((*common_fields(explosion), explosion.frame, *timer_fields(explosion.timer),
+                               entity_row(explosion)))
+        world = self.world.snapshot() if self.world is not None else None
+        return GameState(session, player_data, asteroids, lasers, explosions, world, rng.getstate())
+
+    def restore(self, state):
+        # Puts the session back to the step the state was taken at. Entities come out of
+        # the pools again, so the whole screen needs redrawing afterwards.
+        global sim_ticks
+        self.close()
+        self.all_sprites.empty()
+        self.scheduler.clear()
+        pending = []  # (run order, due time, interval, callback, owner, attribute)
+        world_owners = {}
+
+        def restore_entity(owner, timer_time, timer_order, entity, interval, callback):
+            if timer_order >= 0:
+                pending.append((timer_order, timer_time, interval, callback, owner, 'timer'))
+            if entity >= 0:
+                world_owners[int(entity)] = owner
+
+        (ticks, steps, score, kills, game_over, spawn_interval, last_spawn, base_speed, spawning,
+         spawn_time, spawn_order, speed_time, speed_order, interval_time, interval_order) = state.session
+        self.ticks = ticks
+        self.steps = int(steps)
+        self.score = int(score)
+        self.kills = int(kills)
+        self.game_over = bool(game_over)
+        self.asteroid_spawn_interval = spawn_interval
+        self.asteroid_spawn_timer = last_spawn
+        self.asteroid_base_speed = base_speed
+        self.spawning = bool(spawning)
+        for timer_order, timer_time, attribute in ((spawn_order, spawn_time, 'spawn_timer'),
+                                                   (speed_order, speed_time, 'speed_timer'),
+                                                   (interval_order, interval_time, 'interval_timer')):
+            timer = getattr(self, attribute)
+            if timer_order >= 0:
+                pending.append((timer_order, timer_time, timer.interval, timer.callback, self, attribute))
+            else:
+                # Not pending, but still cancellable
+                timer = Timer(timer_time, timer.interval, timer.callback, ())
+                timer.cancel()
+                setattr(self, attribute, timer)
+
+        player = self.player
+        x, y, w, h, prev_x, prev_y, rot, energy, last_move_time, move_x, move_y = state.player
+        player.rect = pygame.Rect(x, y, w, h)
+        player.prev_center = (prev_x, prev_y)
+        player.rot = rot
+        player.image = rotate_image(player.image_orig, rot)
+        player.energy = energy
+        player.last_move_time = last_move_time
+        player.circle.place(player.rect.center)
+        player.circle.mx, player.circle.my = move_x, move_y
+        self.all_sprites.add(player)
+
+        for (x, y, w, h, prev_x, prev_y, size, texture, rotated, rot, rot_speed, speed_x, speed_y,
+             move_x, move_y, timer_time, timer_order, entity) in records(state.asteroids, ASTEROID_FIELDS):
+            asteroid = asteroid_pool.acquire(base_speed)  # Its random draws are undone with the rng state
+            asteroid.size = ASTEROID_SIZE_NAMES[int(size)]
+            asteroid.image_orig = asteroid_textures[asteroid.size][int(texture)]
+            asteroid.image = rotate_image(asteroid.image_orig, rot) if rotated else asteroid.image_orig
+            asteroid.rect = pygame.Rect(x, y, w, h)
+            asteroid.prev_center = (prev_x, prev_y)
+            asteroid.rot = rot
+            asteroid.rot_speed = rot_speed
+            asteroid.speedx = speed_x
+            asteroid.speedy = speed_y
+            asteroid.radius = ASTEROID_SIZES[asteroid.size][2]
+            asteroid.circle.radius = asteroid.radius
+            asteroid.circle.place(asteroid.rect.center)
+            asteroid.circle.mx, asteroid.circle.my = move_x, move_y
+            restore_entity(asteroid, timer_time, timer_order, entity, asteroid.rotation_rate, asteroid.rotate)
+            self.all_sprites.add(asteroid)
+            self.asteroids.add(asteroid)
+
+        for (x, y, w, h, prev_x, prev_y, angle, frame, move_x, move_y,
+             timer_time, timer_order, entity) in records(state.lasers, LASER_FIELDS):
+            laser = Laser.pool.acquire(x, y, angle)
+            laser.frame = int(frame)
+            laser.image_orig = laser.frames[laser.frame]
+            laser.image = rotate_image(laser.image_orig, angle)
+            laser.rect = pygame.Rect(x, y, w, h)
+            laser.prev_center = (prev_x, prev_y)
+            laser.segment.place(laser.rect.center, laser.direction, LASER_HALF_LENGTH)
+            laser.segment.mx, laser.segment.my = move_x, move_y
+            restore_entity(laser, timer_time, timer_order, entity, laser.frame_rate, laser.next_frame)
+            self.lasers.add(laser)
+
+        for (x, y, w, h, prev_x, prev_y, frame,
+             timer_time, timer_order, entity) in records(state.explosions, EXPLOSION_FIELDS):
+            explosion = Explosion.pool.acquire((x, y))
+            explosion.frame = int(frame)
+            explosion.image = explosion_anim[explosion.frame]
+            explosion.rect = pygame.Rect(x, y, w, h)
+            explosion.prev_center = (prev_x, prev_y)
+            restore_entity(explosion, timer_time, timer_order, entity, explosion.frame_rate, explosion.next_frame)
+            self.explosions.add(explosion)
+
+        if self.world is not None and state.world is not None:
+            self.world.restore(state.world, [world_owners[row] for row in range(len(world_owners))])
+
+        # Push the timers back in their old run order
+        for timer_order, timer_time, interval, callback, owner, attribute in sorted(pending, key=lambda t: t[0]):
+            setattr(owner, attribute, self.scheduler.push(Timer(timer_time, interval, callback, ())))
+        self.scheduler.now = ticks
+        rng.setstate(state.rng)
+        sim_ticks = ticks
+        self.hud_rects = []
+        self.effect_rects = []
+
+# Scenes run one at a time from SceneManager's loop instead of calling each other
+class Scene:
+    fps = 60
+    reusable = False  # Reusable scenes are kept by the manager and entered again
+
+    def __init__(self, manager):
+        self.manager = manager
+
+    def enter(self):
+        # Called when the scene is pushed
+        pass
+
+    def resume(self):
+        # Called when the scene above this one is popped
+        pass
+
+    def exit(self):
+        # Called when the scene leaves the stack
+        pass
+
+    def resize(self, converted):
+        pass
+
+    def handle_event(self, event):
+        pass
+
+    def update(self, frame_time):
+        pass
+
+    def draw(self):
+        pass
+
+class SceneManager:
+    def __init__(self):
+        self.stack = []
+        self.scenes = {}
+        self.clock = pygame.time.Clock()
+        self.running = False
+
+    def get(self, scene_class):
+        # Returns the shared instance of a reusable scene, or a new one of any other scene
+        if not scene_class.reusable:
+            return scene_class(self)
+        scene = self.scenes.get(scene_class)
+        if scene is None:
+            scene = scene_class(self)
+            self.scenes[scene_class] = scene
+        return scene
+
+    def push(self, scene):
+        self.stack.append(scene)
+        scene.enter()
+
+    def pop(self):
+        self.stack.pop().exit()
+        if self.stack:
+            self.stack[-1].resume()
+
+    def switch(self, scene):
+        # Replaces the whole stack, releasing every finished scene
+        while self.stack:
+            self.stack.pop().exit()
+        self.push(scene)
+
+    def quit(self):
+        self.running = False
+
+    def run(self, scene):
+        self.running = True
+        self.push(scene)
+        while self.running and self.stack:
+            scene = self.stack[-1]
+            frame_time = self.clock.tick(scene.fps)
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    running = False
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_SPACE:
-                        player.shoot()
-                    elif event.key == pygame.K_p:
-                        pause_game()
+                    self.quit()
                 elif event.type == pygame.VIDEORESIZE:
-                    update_screen_size(event.w, event.h)
+                    converted = resize_display(event.w, event.h)
+                    for stacked in self.stack:
+                        stacked.resize(converted)
+                elif self.stack and self.stack[-1] is scene:
+                    scene.handle_event(event)
 
-            # Update
-            all_sprites.update()
-            explosions.update()
+            # A scene that pushed, popped or switched this frame doesn't draw again
+            if self.running and self.stack and self.stack[-1] is scene:
+                scene.update(frame_time)
+            if self.running and self.stack and self.stack[-1] is scene:
+                scene.draw()
 
-            # Increase difficulty over time
-            elapsed_time = pygame.time.get_ticks() - start_ticks
-            adjusted_time = elapsed_time - total_pause_time  # Adjust for paused time
+        while self.stack:
+            self.stack.pop().exit()
 
-            # Increase asteroid base speed over time
-            asteroid_base_speed = 1.5 + (adjusted_time // 5000) * 0.3  # Increase speed every 5 seconds
+# Menu screens: buttons and text on a cached overlay above the starfield
+class MenuScene(Scene):
+    reusable = True
 
-            # Decrease asteroid spawn interval over time to increase difficulty
-            if adjusted_time // 3000 > 0:
-                asteroid_spawn_interval = max(250, 1500 - (adjusted_time // 3000) * 100)
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.buttons = []
+        self.renderer = DirtyRenderer()
+        self.mouse_up = False
 
-            # Spawn new asteroids at intervals
-            if pygame.time.get_ticks() - asteroid_spawn_timer > asteroid_spawn_interval:
-                asteroid_spawn_timer = pygame.time.get_ticks()
-                asteroid = Asteroid(asteroid_base_speed)
-                all_sprites.add(asteroid)
-                asteroids.add(asteroid)
+    def enter(self):
+        self.layout()
+        self.renderer.invalidate()
 
-            # Calculate score
-            score = adjusted_time // 100
+    def resume(self):
+        self.enter()
 
-            # Check for collisions between lasers and asteroids
-            laser_hits = pygame.sprite.groupcollide(asteroids, lasers, True, True)
-            for hit in laser_hits:
-                explosion = Explosion(hit.rect.center)
-                all_sprites.add(explosion)
-                explosions.add(explosion)
-                if collision_sound:
-                    collision_sound.set_volume(effects_volume)
-                    collision_sound.play()
-                # Optionally, increase score when destroying asteroids
-                score += 50
-
-            # Check for collisions between player and asteroids
-            hits = pygame.sprite.spritecollide(player, asteroids, False, pygame.sprite.collide_circle)
-            if hits:
-                if collision_sound:
-                    collision_sound.set_volume(effects_volume)
-                    collision_sound.play()
-                explosion = Explosion(player.rect.center)
-                all_sprites.add(explosion)
-                explosions.add(explosion)
-                # Do not set running to False here; instead, change to a game over state
-                break  # Exit the game loop to proceed to game over
-
-            # Draw/render
-            screen.fill((10, 10, 30))
-            draw_starfield()
-            all_sprites.draw(screen)
-            player.draw(screen)
-            explosions.draw(screen)
-
-            # Draw energy bar
-            pygame.draw.rect(screen, WHITE, (WIDTH - 30, 10, 20, 100), 2)
-            energy_height = int(player.energy)
-            pygame.draw.rect(screen, (0, 255, 0), (WIDTH - 28, 110 - energy_height, 16, energy_height))
-
-            # Draw score
-            score_font = load_font(24)
-            score_text = score_font.render(f"Score: {score}", True, WHITE)
-            screen.blit(score_text, (10, 10))
+    def resize(self, converted):
+        self.layout()
 
-            pygame.display.flip()
-        else:
-            # When paused
-            # Display "PAUSED" text and wait for the player to unpause
-            screen.fill((10, 10, 30))
-            draw_starfield()
+    def layout(self):
+        pass
 
-            pause_text = load_font(72).render("PAUSED", True, WHITE)
-            pause_rect = pause_text.get_rect(center=(WIDTH / 2, HEIGHT / 2))
-            screen.blit(pause_text, pause_rect)
+    def overlay_key(self):
+        return (WIDTH, HEIGHT) + tuple(button.color for button in self.buttons)
 
-            pygame.display.flip()
+    def draw_overlay(self, surface):
+        for button in self.buttons:
+            button.draw(surface)
 
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    pygame.quit()
-                    sys.exit()
-                elif event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_p:
-                        pause_game()
-                elif event.type == pygame.VIDEORESIZE:
-                    update_screen_size(event.w, event.h)
-
-    # Wait for explosion animation to finish
-    while len(explosions) > 0:
-        clock.tick(60)
-        explosions.update()
-        screen.fill((10, 10, 30))
-        draw_starfield()
-        explosions.draw(screen)
-        pygame.display.flip()
-
-    # Stop music when game is over
-    if pygame.mixer.music:
-        pygame.mixer.music.stop()
-    game_over_screen(score)
+    def handle_event(self, event):
+        if event.type == pygame.MOUSEBUTTONUP:
+            self.mouse_up = True
+
+    def update(self, frame_time):
+        mouse_pos = pygame.mouse.get_pos()
+        mouse_up, self.mouse_up = self.mouse_up, False
+        for button in self.buttons:
+            button.update(mouse_pos, mouse_up)
+
+    def draw(self):
+        self.renderer.set_overlay(self.overlay_key(), self.draw_overlay)
+        self.renderer.draw_background()
+        self.renderer.draw_overlay()
+        self.renderer.present()
+
+class MainMenuScene(MenuScene):
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.title_font = load_font(72)
+        self.play_button = Button((0, 0, 200, 50), "Play", lambda: manager.switch(GameScene(manager)))
+        self.scores_button = Button((0, 0, 200, 50), "High Scores", lambda: manager.push(manager.get(HighScoresScene)))
+        self.settings_button = Button((0, 0, 200, 50), "Settings", lambda: manager.push(manager.get(SettingsScene)))
+        self.quit_button = Button((0, 0, 200, 50), "Quit", manager.quit)
+        self.buttons.extend([self.play_button, self.scores_button, self.settings_button, self.quit_button])
+
+    def layout(self):
+        self.play_button.place(WIDTH / 2 - 100, HEIGHT / 2 - 100)
+        self.scores_button.place(WIDTH / 2 - 100, HEIGHT / 2 - 40)
+        self.settings_button.place(WIDTH / 2 - 100, HEIGHT / 2 + 20)
+        self.quit_button.place(WIDTH / 2 - 100, HEIGHT / 2 + 80)
+
+    def draw_overlay(self, surface):
+        title_text = render_text(self.title_font, "ASTEROID DODGER", WHITE)
+        title_rect = title_text.get_rect(center=(WIDTH / 2, HEIGHT / 3 - 50))
+        surface.blit(title_text, title_rect)
+        super().draw_overlay(surface)
+
+class SettingsScene(MenuScene):
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.title_font = load_font(72)
+        self.menu_font = load_font(36)
+        self.slider_dragging = None  # To keep track of which slider is being dragged
+
+        # Slider dimensions; positions are set in layout()
+        self.slider_width = 300
+        self.slider_height = 20
+        self.bg_slider_rect = pygame.Rect(0, 0, self.slider_width, self.slider_height)
+        self.effects_slider_rect = pygame.Rect(0, 0, self.slider_width, self.slider_height)
+        self.bg_handle_rect = pygame.Rect(0, 0, 20, self.slider_height + 10)
+        self.effects_handle_rect = pygame.Rect(0, 0, 20, self.slider_height + 10)
+
+        self.back_button = Button((0, 0, 200, 50), "Back", manager.pop)
+        self.buttons.append(self.back_button)
+
+    def layout(self):
+        # Update slider positions
+        self.bg_slider_rect.topleft = (WIDTH / 2 - self.slider_width / 2, HEIGHT / 2 - 50)
+        self.effects_slider_rect.topleft = (WIDTH / 2 - self.slider_width / 2, HEIGHT / 2 + 50)
+        # Update handle positions based on current volume
+        bg_handle_x = self.bg_slider_rect.x + bg_music_volume * self.slider_width - 10
+        self.bg_handle_rect.topleft = (bg_handle_x, self.bg_slider_rect.y - 5)
+        effects_handle_x = self.effects_slider_rect.x + effects_volume * self.slider_width - 10
+        self.effects_handle_rect.topleft = (effects_handle_x, self.effects_slider_rect.y - 5)
+        self.back_button.place(WIDTH / 2 - 100, HEIGHT - 80)
+
+    def overlay_key(self):
+        return (WIDTH, HEIGHT, self.bg_handle_rect.x, self.effects_handle_rect.x, self.back_button.color)
+
+    def draw_overlay(self, surface):
+        title_text = render_text(self.title_font, "SETTINGS", WHITE)
+        title_rect = title_text.get_rect(center=(WIDTH / 2, HEIGHT / 3 - 50))
+        surface.blit(title_text, title_rect)
+
+        # Background Music Slider
+        bg_text = render_text(self.menu_font, "Background Music Volume", WHITE)
+        bg_text_rect = bg_text.get_rect(center=(WIDTH / 2, HEIGHT / 2 - 80))
+        surface.blit(bg_text, bg_text_rect)
+        pygame.draw.rect(surface, DARK_GRAY, self.bg_slider_rect)
+        # Draw the slider handle
+        pygame.draw.rect(surface, GRAY, self.bg_handle_rect)
+
+        # Sound Effects Slider
+        effects_text = render_text(self.menu_font, "Sound Effects Volume", WHITE)
+        effects_text_rect = effects_text.get_rect(center=(WIDTH / 2, HEIGHT / 2 + 20))
+        surface.blit(effects_text, effects_text_rect)
+        pygame.draw.rect(surface, DARK_GRAY, self.effects_slider_rect)
+        # Draw the slider handle
+        pygame.draw.rect(surface, GRAY, self.effects_handle_rect)
+
+        # Back Button
+        super().draw_overlay(surface)
+
+    def handle_event(self, event):
+        global bg_music_volume, effects_volume
+        super().handle_event(event)
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if self.bg_handle_rect.collidepoint(event.pos):
+                self.slider_dragging = 'bg'
+            elif self.effects_handle_rect.collidepoint(event.pos):
+                self.slider_dragging = 'effects'
+        elif event.type == pygame.MOUSEBUTTONUP:
+            self.slider_dragging = None
+        elif event.type == pygame.MOUSEMOTION:
+            if self.slider_dragging == 'bg':
+                # Update background music volume
+                relative_x = event.pos[0] - self.bg_slider_rect.x
+                bg_music_volume = max(0, min(relative_x / self.slider_width, 1))
+                if pygame.mixer.music:
+                    pygame.mixer.music.set_volume(bg_music_volume)
+                self.layout()
+            elif self.slider_dragging == 'effects':
+                # Update sound effects volume
+                relative_x = event.pos[0] - self.effects_slider_rect.x
+                effects_volume = max(0, min(relative_x / self.slider_width, 1))
+                self.layout()
+
+class HighScoresScene(MenuScene):
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.title_font = load_font(72)
+        self.score_font = load_font(36)
+        self.high_scores = []
+        self.back_button = Button((0, 0, 200, 50), "Back", manager.pop)
+        self.buttons.append(self.back_button)
+
+    def enter(self):
+        self.high_scores = open_leaderboard().top(HIGH_SCORES_SHOWN)
+        super().enter()
+
+    def layout(self):
+        self.back_button.place(WIDTH / 2 - 100, HEIGHT - 80)
+
+    def overlay_key(self):
+        return super().overlay_key() + tuple(self.high_scores)
+
+    def draw_overlay(self, surface):
+        title_text = render_text(self.title_font, "HIGH SCORES", WHITE)
+        title_rect = title_text.get_rect(center=(WIDTH / 2, HEIGHT / 3 - 50))
+        surface.blit(title_text, title_rect)
+
+        # Display high scores
+        y_offset = HEIGHT / 3
+        for i, (score, player, played_at, version, seed) in enumerate(self.high_scores):
+            # Scores imported from the old file have no player
+            name = f"  {player}" if player else ""
+            score_text = render_text(self.score_font, f"{i + 1}. {score}{name}  {played_at[:10]}", WHITE)
+            score_rect = score_text.get_rect(center=(WIDTH / 2, y_offset + i * 40))
+            surface.blit(score_text, score_rect)
+
+        super().draw_overlay(surface)
+
+class GameOverScene(MenuScene):
+    reusable = False
+
+    def __init__(self, manager, score, seed=None):
+        super().__init__(manager)
+        self.score = score
+        self.title_font = load_font(72)
+        self.font = load_font(36)
+
+        # Record the run, then see how it compares with every earlier run of this version
+        board = open_leaderboard()
+        board.add(score, PLAYER_NAME, GAME_VERSION, seed)
+        self.percentile = board.percentile_rank(score, GAME_VERSION)
+
+        self.play_button = Button((0, 0, 200, 50), "Play Again", lambda: manager.switch(GameScene(manager)))
+        self.settings_button = Button((0, 0, 200, 50), "Settings", lambda: manager.push(manager.get(SettingsScene)))
+        self.scores_button = Button((0, 0, 200, 50), "High Scores", lambda: manager.push(manager.get(HighScoresScene)))
+        self.quit_button = Button((0, 0, 200, 50), "Quit", manager.quit)
+        self.buttons.extend([self.play_button, self.settings_button, self.scores_button, self.quit_button])
+
+    def layout(self):
+        self.play_button.place(WIDTH / 2 - 100, HEIGHT / 2 + 70)
+        self.settings_button.place(WIDTH / 2 - 100, HEIGHT / 2 + 140)
+        self.scores_button.place(WIDTH / 2 - 100, HEIGHT / 2 + 210)
+        self.quit_button.place(WIDTH / 2 - 100, HEIGHT / 2 + 280)
+
+    def draw_overlay(self, surface):
+        game_over_text = render_text(self.title_font, "GAME OVER", (255, 0, 0))
+        game_over_rect = game_over_text.get_rect(center=(WIDTH / 2, HEIGHT / 3 - 50))
+        surface.blit(game_over_text, game_over_rect)
+
+        score_text = render_text(self.font, f"Final Score: {self.score}", WHITE)
+        score_rect = score_text.get_rect(center=(WIDTH / 2, HEIGHT / 2 - 50))
+        surface.blit(score_text, score_rect)
+
+        rank_text = render_text(self.font, f"Better than {self.percentile:.0f}% of runs", GRAY)
+        surface.blit(rank_text, rank_text.get_rect(center=(WIDTH / 2, HEIGHT / 2)))
+
+        super().draw_overlay(surface)
+
+class GameScene(Scene):
+    def __init__(self, manager):
+        super().__init__(manager)
+        self.fps = MAX_FPS
+        # Every game is seeded so its recorded inputs can replay it
+        self.seed = int.from_bytes(os.urandom(4), 'little')
+        self.session = GameSession(self.seed)
+        self.recorder = InputRecorder(self.seed, replay_flags(), INITIAL_ASTEROIDS, (WIDTH, HEIGHT))
+        self.renderer = DirtyRenderer()
+        self.accumulator = 0
+        self.pending_inputs = 0  # Key presses waiting for the next simulation step
+        self.history = RingBuffer(REWIND_SECONDS * SIM_RATE) if REWIND_SECONDS else None
+
+    def enter(self):
+        # Play background music (if available)
+        if pygame.mixer.music:
+            pygame.mixer.music.set_volume(bg_music_volume)
+            pygame.mixer.music.play(loops=-1)
+
+    def resume(self):
+        self.renderer.invalidate()
+
+    def exit(self):
+        self.session.close()
+        # Stop music when game is over
+        if pygame.mixer.music:
+            pygame.mixer.music.stop()
+
+    def resize(self, converted):
+        self.session.convert_images(converted)
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and not self.session.game_over:
+            if event.key == pygame.K_SPACE:
+                self.pending_inputs |= INPUT_SHOOT
+            elif event.key == pygame.K_p:
+                # Simulation time stands still while paused, so no bookkeeping is needed
+                self.pending_inputs |= INPUT_PAUSE
+                self.manager.push(PausedScene(self.manager, self))
+            elif event.key == pygame.K_BACKSPACE and self.history:
+                self.rewind(SIM_RATE)
+
+    def rewind(self, steps):
+        # Jump back up to `steps` simulation steps; the recording forgets them too
+        state = None
+        while self.history and steps > 0:
+            state = self.history.pop()
+            steps -= 1
+        if state is not None:
+            self.session.restore(state)
+            self.recorder.truncate(self.session.steps)
+            self.accumulator = 0
+            self.renderer.invalidate()
+
+    def update(self, frame_time):
+        global sim_ticks
+        session = self.session
+        if not session.game_over:
+            # Advance the simulation in fixed steps for the time that has passed
+            self.accumulator += min(frame_time, MAX_FRAME_TIME)
+            while self.accumulator >= SIM_STEP and not session.game_over:
+                self.accumulator -= SIM_STEP
+                inputs = read_keyboard_input() | self.pending_inputs
+                if self.history is not None:
+                    self.history.append(session.snapshot())
+                self.recorder.record(inputs)
+                session.step(inputs)
+                self.pending_inputs = 0
+        else:
+            # Wait for explosion animation to finish
+            sim_ticks += frame_time
+            session.update_explosions()
+            if not session.explosions:
+                self.recorder.save(REPLAY_FILE, session.score)
+                self.manager.switch(GameOverScene(self.manager, session.score, self.seed))
+
+    def draw(self):
+        if not self.session.game_over:
+            self.session.draw(self.renderer, self.accumulator / SIM_STEP)
+        else:
+            self.renderer.invalidate()
+            self.renderer.draw_background()
+            self.session.explosions.draw(screen)
+            self.renderer.present()
+
+class PausedScene(Scene):
+    def __init__(self, manager, game):
+        super().__init__(manager)
+        self.game = game
+
+    def handle_event(self, event):
+        if event.type == pygame.KEYDOWN and event.key == pygame.K_p:
+            self.manager.pop()
+
+    def draw_overlay(self, surface):
+        pause_text = render_text(load_font(72), "PAUSED", WHITE)
+        pause_rect = pause_text.get_rect(center=(WIDTH / 2, HEIGHT / 2))
+        surface.blit(pause_text, pause_rect)
+
+    def draw(self):
+        # Display "PAUSED" text over the starfield until the player unpauses
+        renderer = self.game.renderer
+        renderer.set_overlay(("PAUSED", WIDTH, HEIGHT), self.draw_overlay)
+        renderer.draw_background()
+        renderer.draw_overlay()
+        renderer.present()
+
+# Scripted input source: (steps, inputs) pairs played in order, optionally looping
+class ScriptedInput:
+    def __init__(self, script, loop=True):
+        self.script = script
+        self.loop = loop
+        self.index = 0
+        self.remaining = script[0][0] if script else 0
+
+    def __call__(self, session):
+        if not self.script:
+            return 0
+        while self.remaining <= 0:
+            self.index += 1
+            if self.index >= len(self.script):
+                if not self.loop:
+                    return 0
+                self.index = 0
+            self.remaining = self.script[self.index][0]
+        self.remaining -= 1
+        return self.script[self.index][1]
+
+# Strafe in a square while turning and firing
+DEMO_SCRIPT = [
+    (30, INPUT_LEFT | INPUT_SHOOT),
+    (30, INPUT_UP | INPUT_ROTATE_LEFT),
+    (30, INPUT_RIGHT | INPUT_SHOOT),
+    (30, INPUT_DOWN | INPUT_ROTATE_RIGHT),
+]
+
+def run_headless(input_source, seed=None, max_steps=None, render=False, step_times=None):
+    # Runs one game as fast as possible; input_source(session) returns the step's inputs.
+    # Each step's time in milliseconds (including rendering) is appended to step_times.
+    session = GameSession(seed)
+    renderer = DirtyRenderer() if render else None
+    while not session.game_over and (max_steps is None or session.steps < max_steps):
+        inputs = input_source(session)
+        start = time.perf_counter()
+        session.step(inputs)
+        if renderer is not None:
+            session.draw(renderer)
+        if step_times is not None:
+            step_times.append((time.perf_counter() - start) * 1000)
+    session.close()
+    return session
 
 if __name__ == "__main__":
-    show_menu()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Asteroid Dodger")
+    parser.add_argument("--asteroids", type=int, default=INITIAL_ASTEROIDS,
+                        help="initial asteroid count, e.g. 5000 for stress tests")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="only update the changed regions of the screen")
+    parser.add_argument("--fps", type=int, default=MAX_FPS,
+                        help="render frame rate cap during play, 0 for uncapped")
+    parser.add_argument("--pixel-perfect", action="store_true",
+                        help="check player hits against the exact ship and asteroid pixels")
+    parser.add_argument("--rewind", type=int, default=REWIND_SECONDS, metavar="SECONDS",
+                        help="keep this much play history and rewind a second with Backspace (debugging)")
+    parser.add_argument("--player", default=PLAYER_NAME, help="name recorded with your scores")
+    parser.add_argument("--headless", action="store_true",
+                        help="simulate scripted games without a window or audio")
+    parser.add_argument("--games", type=int, default=1, help="number of headless games")
+    parser.add_argument("--seed", type=int, default=None, help="random seed of the first headless game")
+    parser.add_argument("--max-steps", type=int, default=None, help="step limit per headless game")
+    parser.add_argument("--render", action="store_true", help="also render headless games")
+    parser.add_argument("--replay", metavar="FILE",
+                        help=f"replay a recorded game headless as fast as possible, e.g. {REPLAY_FILE}")
+    args = parser.parse_args()
+    INITIAL_ASTEROIDS = args.asteroids
+    MAX_FPS = args.fps
+    DIRTY_RECTS = args.dirty_rects
+    PIXEL_PERFECT = args.pixel_perfect
+    REWIND_SECONDS = args.rewind
+    PLAYER_NAME = args.player
+    if args.replay:
+        # The recording's settings override the command line
+        replay = Replay.load(args.replay)
+        INITIAL_ASTEROIDS = replay.initial_asteroids
+        PIXEL_PERFECT = bool(replay.flags & FLAG_PIXEL_PERFECT)
+        if bool(replay.flags & FLAG_ECS) != (World is not None):
+            print("Warning: replay was recorded with a different simulation backend (NumPy), "
+                  "so it may not play out the same")
+        if replay.size != (WIDTH, HEIGHT):
+            resize_display(*replay.size)
+    if PIXEL_PERFECT:
+        precompute_masks()
+    if args.replay:
+        session = run_headless(ReplayInput(replay), replay.seed, replay.steps, args.render)
+        print(f"Replay: score {session.score} (recorded {replay.score}), kills {session.kills}, "
+              f"{session.steps} of {replay.steps} steps")
+    elif args.headless:
+        for game in range(args.games):
+            seed = None if args.seed is None else args.seed + game
+            session = run_headless(ScriptedInput(DEMO_SCRIPT), seed, args.max_steps, args.render)
+            print(f"Game {game + 1}: score {session.score}, kills {session.kills}, "
+                  f"survived {session.ticks / 1000:.1f}s")
+    else:
+        manager = SceneManager()
+        manager.run(manager.get(MainMenuScene))
+        pygame.quit()
\ No newline at end of file
@@ -0,0 +1,95 @@
+import os
+import math
+import sqlite3
+import datetime
+
+# Every finished game's score in SQLite, with the player, the time (UTC, ISO
+# 8601), the game version and the seed that replays it. Adding a score is one
+# INSERT instead of rewriting a file, and top-N and percentile queries walk the
+# score index instead of loading every run. The database runs in WAL mode, so
+# tools can read it while a game is writing.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scores (
+    id INTEGER PRIMARY KEY,
+    score INTEGER NOT NULL,
+    player TEXT NOT NULL,
+    played_at TEXT NOT NULL,
+    version TEXT NOT NULL,
+    seed INTEGER
+);
+CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score);
+CREATE INDEX IF NOT EXISTS scores_by_version ON scores (version, score);
+"""
+
+
+class Leaderboard:
+    def __init__(self, path):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL; only the last commits can be lost
+        self.connection.executescript(SCHEMA)
+
+    def __len__(self):
+        return self.count()
+
+    def close(self):
+        self.connection.close()
+
+    def add(self, score, player, version, seed=None, played_at=None):
+        if played_at is None:
+            played_at = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO scores (score, player, played_at, version, seed) VALUES (?, ?, ?, ?, ?)",
+                (score, player, played_at, version, seed))
+        return cursor.lastrowid
+
+    def import_text(self, path, version, player=""):
+        # Adds the scores of a scores.txt style file, one number per line (commas and
+        # other non-digits ignored); the old file has no names, dates or seeds, so the
+        # file's modification time stands in for the date. Returns how many were added.
+        played_at = datetime.datetime.fromtimestamp(os.path.getmtime(path), datetime.timezone.utc)
+        with open(path) as file:
+            digits = [''.join(filter(str.isdigit, line)) for line in file]
+        scores = [int(score) for score in digits if score]
+        with self.connection:
+            self.connection.executemany(
+                "INSERT INTO scores (score, player, played_at, version) VALUES (?, ?, ?, ?)",
+                [(score, player, played_at.isoformat(timespec="seconds"), version) for score in scores])
+        return len(scores)
+
+    def where(self, version):
+        return ("WHERE version = ?", (version,)) if version is not None else ("", ())
+
+    def count(self, version=None):
+        where, args = self.where(version)
+        return self.connection.execute(f"SELECT COUNT(*) FROM scores {where}", args).fetchone()[0]
+
+    def top(self, count=5, version=None):
+        # (score, player, played_at, version, seed) rows, best first; ties keep the earlier run first
+        where, args = self.where(version)
+        return self.connection.execute(
+            f"SELECT score, player, played_at, version, seed FROM scores {where} ORDER BY score DESC, id LIMIT ?",
+            args + (count,)).fetchall()
+
+    def percentile_rank(self, score, version=None):
+        # Percentage of runs that scored less than score
+        total = self.count(version)
+        if not total:
+            return 0.0
+        where, args = self.where(version)
+        condition = f"{where} AND" if where else "WHERE"
+        below = self.connection.execute(f"SELECT COUNT(*) FROM scores {condition} score < ?",
+                                        args + (score,)).fetchone()[0]
+        return 100 * below / total
+
+    def score_at(self, percentile, version=None):
+        # Nearest-rank percentile of all scores, None when there are none
+        total = self.count(version)
+        if not total:
+            return None
+        where, args = self.where(version)
+        index = max(0, math.ceil(percentile / 100 * total) - 1)
+        return self.connection.execute(f"SELECT score FROM scores {where} ORDER BY score LIMIT 1 OFFSET ?",
+                                       args + (index,)).fetchone()[0]
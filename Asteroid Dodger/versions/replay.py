@@ -0,0 +1,131 @@
+import struct
+
+# Input replays: the seed, the settings that change the simulation and one input
+# byte per simulation step, which together reproduce a whole run. Inputs only
+# change when a key does, so the steps are stored run-length encoded as
+# (varint step count, input byte) pairs; a minute of play is usually well
+# under a kilobyte.
+
+MAGIC = b"ADRP"
+VERSION = 1
+# magic, version, flags, seed, initial asteroids, screen width and height, steps, score
+HEADER = struct.Struct("<4sBBqIHHII")
+
+# Settings that change the simulation
+FLAG_PIXEL_PERFECT = 1
+FLAG_ECS = 2  # The NumPy World draws asteroid drift differently from the sprite path
+
+
+class ReplayError(Exception):
+    pass
+
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        if pos >= len(data):
+            raise ReplayError("truncated replay")
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if byte < 0x80:
+            return value, pos
+
+
+class InputRecorder:
+    # Settings are taken when the game starts; the screen size bounds where
+    # asteroids spawn and respawn, so resizing mid-game isn't reproduced
+    def __init__(self, seed, flags, initial_asteroids, size):
+        self.seed = seed
+        self.flags = flags
+        self.initial_asteroids = initial_asteroids
+        self.size = size
+        self.runs = []  # [inputs, steps] pairs
+        self.steps = 0
+
+    def record(self, inputs):
+        if self.runs and self.runs[-1][0] == inputs:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([inputs, 1])
+        self.steps += 1
+
+    def truncate(self, steps):
+        # Forgets everything after the first `steps` steps, e.g. after a rewind
+        while self.steps > steps:
+            run = self.runs[-1]
+            dropped = min(run[1], self.steps - steps)
+            run[1] -= dropped
+            if not run[1]:
+                self.runs.pop()
+            self.steps -= dropped
+
+    def to_bytes(self, score):
+        width, height = self.size
+        out = bytearray(HEADER.pack(MAGIC, VERSION, self.flags, self.seed, self.initial_asteroids,
+                                    width, height, self.steps, score))
+        for inputs, steps in self.runs:
+            write_varint(out, steps)
+            out.append(inputs)
+        return bytes(out)
+
+    def save(self, path, score):
+        with open(path, "wb") as file:
+            file.write(self.to_bytes(score))
+
+
+class Replay:
+    def __init__(self, seed, flags, initial_asteroids, size, steps, score, runs):
+        self.seed = seed
+        self.flags = flags
+        self.initial_asteroids = initial_asteroids
+        self.size = size
+        self.steps = steps
+        self.score = score  # Final score of the recorded run, to check the playback against
+        self.runs = runs
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < HEADER.size:
+            raise ReplayError("not a replay file")
+        magic, version, flags, seed, initial_asteroids, width, height, steps, score = HEADER.unpack_from(data)
+        if magic != MAGIC:
+            raise ReplayError("not a replay file")
+        if version != VERSION:
+            raise ReplayError(f"unsupported replay version {version}")
+        runs = []
+        pos = HEADER.size
+        while pos < len(data):
+            count, pos = read_varint(data, pos)
+            if pos >= len(data):
+                raise ReplayError("truncated replay")
+            runs.append((data[pos], count))
+            pos += 1
+        return cls(seed, flags, initial_asteroids, (width, height), steps, score, runs)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+    def __iter__(self):
+        for inputs, steps in self.runs:
+            for _ in range(steps):
+                yield inputs
+
+
+class ReplayInput:
+    # Input source for GameSession runs that plays a recording back, then no input
+    def __init__(self, replay):
+        self.inputs = iter(replay)
+
+    def __call__(self, session):
+        return next(self.inputs, 0)
@@ -0,0 +1,94 @@
+import os
+import re
+import sys
+import random
+import argparse
+import tempfile
+import subprocess
+
+# Checks that recorded games replay exactly. Several games are played in a row
+# in one process through GameScene, like a player pressing "Play Again", with
+# random keys and uneven frame times. Each game's recording is then replayed in
+# a fresh process with gamev7.py --replay and must end with the same score after
+# the same number of steps. State left over from one game (clocks, pools, random
+# streams) shows up here as a later game that replays differently.
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ["ASTEROID_DODGER_HEADLESS"] = "1"
+
+import pygame
+
+GAMES = 12
+SEED = 1  # Without the per-game clock reset this run fails on games 2, 8, 9 and 12
+FRAME_TIMES = [8, 17, 17, 33, 60]  # Milliseconds; uneven, so steps don't line up with frames
+HOLD_FRAMES = 20  # Frames each random key combination is held
+SHOT_CHANCE = 0.15  # Chance of a Space press per frame
+KEYS = ["INPUT_LEFT", "INPUT_RIGHT", "INPUT_UP", "INPUT_DOWN", "INPUT_ROTATE_LEFT", "INPUT_ROTATE_RIGHT"]
+REPLAY_OUTPUT = re.compile(r"Replay: score (\d+) \(recorded (\d+)\).* (\d+) of (\d+) steps")
+
+
+def record_games(game, count, folder, seed):
+    # Plays count games back to back and returns the paths of their recordings
+    chooser = random.Random(seed)
+    held = [0]
+    game.read_keyboard_input = lambda: held[0]
+    manager = game.SceneManager()
+    manager.push(game.GameScene(manager))
+    replays = []
+    frame = 0
+    while len(replays) < count:
+        scene = manager.stack[-1]
+        if isinstance(scene, game.GameOverScene):
+            path = os.path.join(folder, f"game{len(replays) + 1}.replay")
+            os.replace(game.REPLAY_FILE, path)
+            replays.append(path)
+            manager.switch(game.GameScene(manager))  # Play Again
+            continue
+        frame += 1
+        if frame % HOLD_FRAMES == 0:
+            held[0] = 0
+            for name in chooser.sample(KEYS, chooser.randint(0, 2)):
+                held[0] |= getattr(game, name)
+        if chooser.random() < SHOT_CHANCE:
+            scene.handle_event(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+        scene.update(chooser.choice(FRAME_TIMES))
+        scene.draw()
+    while manager.stack:
+        manager.stack.pop().exit()
+    return replays
+
+
+def replay(path):
+    # (score, recorded score, steps played, steps recorded) from a fresh process
+    folder = os.path.dirname(os.path.abspath(__file__))
+    output = subprocess.run([sys.executable, os.path.join(folder, "gamev7.py"), "--replay", path],
+                            capture_output=True, text=True, check=True).stdout
+    return tuple(int(value) for value in REPLAY_OUTPUT.search(output).groups())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check that games played in a row replay exactly")
+    parser.add_argument("--games", type=int, default=GAMES)
+    parser.add_argument("--seed", type=int, default=SEED, help="seed of the random keys and frame times")
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+    import gamev7 as game
+
+    failures = 0
+    with tempfile.TemporaryDirectory() as folder:
+        # Keep the recordings and scores of the check away from the player's
+        game.REPLAY_FILE = os.path.join(folder, "last_game.replay")
+        game.LEADERBOARD_FILE = os.path.join(folder, "leaderboard.db")
+        game.HIGH_SCORES_FILE = os.path.join(folder, "scores.txt")
+        for number, path in enumerate(record_games(game, args.games, folder, args.seed), 1):
+            score, recorded, steps, recorded_steps = replay(path)
+            ok = score == recorded and steps == recorded_steps
+            failures += not ok
+            print(f"Game {number}: {'ok' if ok else 'MISMATCH'}, score {score} (recorded {recorded}), "
+                  f"{steps} of {recorded_steps} steps")
+        if game.leaderboard is not None:
+            game.leaderboard.close()
+    print(f"{args.games - failures} of {args.games} games replayed exactly")
+    sys.exit(1 if failures else 0)
@@ -0,0 +1,65 @@
+import random
+
+try:
+    import numpy as np
+except ImportError:  # Bulk draws fall back to one value at a time
+    np = None
+
+# Seeded random number streams. Each part of the game draws from its own
+# stream, so drawing more frames on a fast machine can't change where asteroids
+# spawn, and a spawn can't change how they drift. All streams are seeded from
+# one root seed, which together with the inputs reproduces a whole run.
+
+
+class RandomStream(random.Random):
+    # random.Random plus bulk draws, made by a NumPy Generator seeded from this stream
+
+    def seed(self, a=None, version=2):
+        super().seed(a, version)
+        self.generator = np.random.default_rng(self.getrandbits(64)) if np is not None else None
+
+    def getstate(self):
+        generator_state = self.generator.bit_generator.state if self.generator is not None else None
+        return super().getstate(), generator_state
+
+    def setstate(self, state):
+        state, generator_state = state
+        super().setstate(state)
+        if generator_state is not None:
+            self.generator.bit_generator.state = generator_state
+
+    def integers(self, count, high):
+        # count ints in [0, high)
+        if self.generator is not None:
+            return self.generator.integers(high, size=count).tolist()
+        return [self.randrange(high) for _ in range(count)]
+
+    def uniforms(self, count, low, high):
+        # count floats in [low, high)
+        if self.generator is not None:
+            return self.generator.uniform(low, high, count).tolist()
+        return [self.uniform(low, high) for _ in range(count)]
+
+
+class RandomStreams:
+    def __init__(self, seed=None):
+        self.simulation = RandomStream()  # Per-step asteroid drift
+        self.spawn = RandomStream()  # Asteroid size, texture, position and speed
+        self.cosmetic = RandomStream()  # Textures, stars and twinkle; never affects gameplay
+        self.reseed(seed)
+
+    def streams(self):
+        return (self.simulation, self.spawn, self.cosmetic)
+
+    def reseed(self, seed=None):
+        self.seed = seed
+        root = random.Random(seed)
+        for stream in self.streams():
+            stream.seed(root.getrandbits(64))
+
+    def getstate(self):
+        return tuple(stream.getstate() for stream in self.streams())
+
+    def setstate(self, state):
+        for stream, stream_state in zip(self.streams(), state):
+            stream.setstate(stream_state)
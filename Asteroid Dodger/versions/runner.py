@@ -0,0 +1,166 @@
+import os
+import sys
+import json
+import random
+import argparse
+import importlib
+import itertools
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from benchmark import percentile, format_rows, PERCENTILES
+
+# Parallel balance runs: thousands of seeded headless gamev7 games fanned out
+# over worker processes, each with its own pygame on SDL's dummy drivers.
+# Difficulty constants can be swept as a grid (--set NAME=V1,V2,...), and every
+# game's score, survival time, kills and step times go into one JSON results
+# file next to a summary per setting.
+
+GAMES = 1000
+SEED = 1
+CHUNK_SIZE = 25  # Games per task, so sending results back stays cheap next to playing them
+RESULTS_FILE = "balance_results.json"
+INPUTS = ["demo", "idle", "random"]
+# gamev7 constants that --set accepts
+BALANCE = [
+    "INITIAL_ASTEROIDS",
+    "SPAWN_INTERVAL_START",
+    "SPAWN_INTERVAL_MIN",
+    "SPAWN_INTERVAL_STEP",
+    "SPAWN_INTERVAL_PERIOD",
+    "ASTEROID_SPEED_START",
+    "ASTEROID_SPEED_STEP",
+    "ASTEROID_SPEED_PERIOD",
+]
+RANDOM_HOLD = 10  # Steps each random input is held, roughly a quick key press
+
+# Set in each worker process by init_worker
+game = None
+
+
+class RandomInput:
+    # Random key combinations from the game's own seed; it has its own generator so
+    # the game's random streams don't depend on the input
+    def __init__(self, seed):
+        self.random = random.Random(seed)
+        self.inputs = 0
+
+    def __call__(self, session):
+        if session.steps % RANDOM_HOLD == 0:
+            self.inputs = self.random.getrandbits(7)
+        return self.inputs
+
+
+def input_source(name, seed):
+    if name == "demo":
+        return game.ScriptedInput(game.DEMO_SCRIPT)
+    if name == "random":
+        return RandomInput(seed)
+    return lambda session: 0
+
+
+def init_worker():
+    global game
+    os.environ["ASTEROID_DODGER_HEADLESS"] = "1"
+    game = importlib.import_module("gamev7")
+
+
+def run_games(setting, values, seeds, inputs, max_steps, render):
+    # Plays one chunk of games with the setting's constants in a worker. Each game
+    # reseeds the random streams and restarts sim_ticks in GameSession, so a game's
+    # result doesn't depend on which games ran before it in the same worker
+    for name, value in values.items():
+        setattr(game, name, value)
+    results = []
+    for seed in seeds:
+        step_times = []
+        session = game.run_headless(input_source(inputs, seed), seed, max_steps, render, step_times)
+        result = {"setting": setting, "seed": seed, "score": session.score, "survived": round(session.ticks / 1000, 3),
+                  "kills": session.kills, "steps": session.steps, "game_over": session.game_over,
+                  "step_ms_mean": sum(step_times) / len(step_times)}
+        for p in PERCENTILES:
+            result[f"step_ms_p{p}"] = percentile(step_times, p)
+        result["step_ms_max"] = max(step_times)
+        results.append(result)
+    return results
+
+
+def parse_setting(text):
+    name, _, values = text.partition("=")
+    if name not in BALANCE or not values:
+        raise argparse.ArgumentTypeError(f"expected NAME=V1,V2,... with NAME one of {', '.join(BALANCE)}")
+    try:
+        return name, [json.loads(value) for value in values.split(",")]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{name}: values must be numbers")
+
+
+def settings_grid(sets):
+    # Every combination of the swept values; later --set NAMEs override earlier ones
+    swept = dict(sets)
+    return [dict(zip(swept, values)) for values in itertools.product(*swept.values())]
+
+
+def summarize(values, games):
+    summary = dict(values)
+    summary["games"] = len(games)
+    summary["game_overs"] = sum(g["game_over"] for g in games)
+    for field in ["score", "survived", "kills"]:
+        samples = [g[field] for g in games]
+        summary[f"{field}_mean"] = sum(samples) / len(samples)
+        for p in PERCENTILES:
+            summary[f"{field}_p{p}"] = percentile(samples, p)
+    steps = sum(g["steps"] for g in games)
+    summary["step_ms_mean"] = sum(g["step_ms_mean"] * g["steps"] for g in games) / steps
+    summary["step_ms_p99_worst"] = max(g["step_ms_p99"] for g in games)  # Slowest game's 99th percentile
+    return summary
+
+
+def format_summaries(summaries, names):
+    columns = ["games", "score_mean", "score_p50", "survived_mean", "survived_p50", "survived_p95", "kills_mean",
+               "step_ms_mean", "step_ms_p99_worst"]
+    header = names + columns
+    rows = [[str(s[c]) for c in names] + [f"{s[c]:.2f}" if isinstance(s[c], float) else str(s[c]) for c in columns]
+            for s in summaries]
+    return format_rows(header, rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Play many seeded Asteroid Dodger games in parallel for balance tuning")
+    parser.add_argument("--games", type=int, default=GAMES, help="games per setting")
+    parser.add_argument("--seed", type=int, default=SEED, help="seed of the first game; games use consecutive seeds")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help="games per task sent to a worker; results don't depend on it")
+    parser.add_argument("--input", choices=INPUTS, default="demo",
+                        help="demo script, no input, or random keys from each game's seed")
+    parser.add_argument("--max-steps", type=int, default=None, help="step limit per game")
+    parser.add_argument("--render", action="store_true", help="also render every step (counted in step times)")
+    parser.add_argument("--set", type=parse_setting, action="append", default=[], metavar="NAME=V1,V2,...",
+                        help="difficulty constant to sweep, e.g. SPAWN_INTERVAL_START=1000,1500; repeatable")
+    parser.add_argument("--output", default=RESULTS_FILE, help="results file (JSON)")
+    args = parser.parse_args()
+
+    settings = settings_grid(args.set)
+    seeds = list(range(args.seed, args.seed + args.games))
+    chunks = [seeds[i:i + args.chunk_size] for i in range(0, len(seeds), args.chunk_size)]
+    games = [[] for _ in settings]
+    # Fresh interpreters rather than forks, so every worker sets up its own pygame
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(args.workers, mp_context=context, initializer=init_worker) as executor:
+        futures = [executor.submit(run_games, index, values, chunk, args.input, args.max_steps, args.render)
+                   for index, values in enumerate(settings) for chunk in chunks]
+        for done, future in enumerate(as_completed(futures), 1):
+            results = future.result()
+            games[results[0]["setting"]].extend(results)
+            print(f"{done}/{len(futures)} chunks done", file=sys.stderr)
+
+    for setting_games in games:
+        setting_games.sort(key=lambda g: g["seed"])
+    summaries = [summarize(values, setting_games) for values, setting_games in zip(settings, games)]
+    print(format_summaries(summaries, list(settings[0])))
+    with open(args.output, "w") as file:
+        json.dump({"input": args.input, "max_steps": args.max_steps, "render": args.render,
+                   "settings": summaries, "games": [g for setting_games in games for g in setting_games]},
+                  file, indent=2)
@@ -0,0 +1,63 @@
+import heapq
+import itertools
+
+# Timer scheduler backed by a min-heap: callbacks are queued by the time they
+# are due, so each tick only touches the timers that fire instead of polling
+# every entity. Repeating timers are rescheduled from their due time, not from
+# the tick that ran them, so they don't drift with the step size. Cancelled
+# timers stay in the heap and are skipped when they come up.
+
+
+class Timer:
+    __slots__ = ('time', 'interval', 'callback', 'args', 'cancelled')
+
+    def __init__(self, time, interval, callback, args):
+        self.time = time
+        self.interval = interval  # None for one-shot timers
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+
+    def cancel(self):
+        self.cancelled = True
+
+
+class Scheduler:
+    def __init__(self, now=0):
+        self.now = now
+        self.queue = []
+        self.order = itertools.count()  # Timers due at the same time run in the order they were added
+
+    def push(self, timer):
+        heapq.heappush(self.queue, (timer.time, next(self.order), timer))
+        return timer
+
+    def schedule_at(self, time, callback, *args):
+        return self.push(Timer(time, None, callback, args))
+
+    def schedule(self, delay, callback, *args):
+        return self.push(Timer(self.now + delay, None, callback, args))
+
+    def every(self, interval, callback, *args):
+        return self.push(Timer(self.now + interval, interval, callback, args))
+
+    def clear(self):
+        self.queue.clear()
+
+    def timers(self):
+        # Live timers in the order they will run
+        return [timer for _, _, timer in sorted(self.queue) if not timer.cancelled]
+
+    def run_until(self, now):
+        # Runs every timer due at or before now; self.now is the due time while it runs
+        queue = self.queue
+        while queue and queue[0][0] <= now:
+            time, _, timer = heapq.heappop(queue)
+            if timer.cancelled:
+                continue
+            self.now = time
+            timer.callback(*timer.args)
+            if timer.interval is not None and not timer.cancelled:
+                timer.time = time + timer.interval
+                self.push(timer)
+        self.now = now